@@ -1,6 +1,17 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from api import signals
+
+        signals.connect_signals()
+        # У приложения api нет моделей, и post_migrate для него не
+        # отправляется, поэтому подписываемся на приложение reviews.
+        post_migrate.connect(
+            signals.reset_versions, sender=apps.get_app_config('reviews')
+        )
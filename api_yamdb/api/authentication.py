@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import TokenRevocation, User
+
+# Поля пользователя, которые копируются в токен.
+TOKEN_CLAIMS = ('username', 'role', 'is_superuser')
+
+
+class YamdbAccessToken(AccessToken):
+    """Access-токен с ролью пользователя в claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in TOKEN_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class RevocationList:
+    """
+    Список отзывов токенов: таблица TokenRevocation и ее копия в процессе.
+
+    Таблица общая для всех воркеров и ничем не вытесняется. Копия
+    перечитывается не чаще раза в ``refresh`` секунд, поэтому быстрый
+    путь аутентификации не ходит в базу на каждый запрос. Отзыв виден
+    в своем процессе сразу, в остальных - не позже чем через
+    ``refresh`` секунд.
+    """
+
+    def __init__(self, refresh):
+        self.refresh = refresh
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.revoked = {}
+            self.loaded = None
+
+    def horizon(self):
+        """Более старые отзывы не нужны: такие токены уже истекли."""
+        return time.time() - api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+
+    def load(self):
+        now = time.monotonic()
+        with self.lock:
+            if self.loaded is not None and now - self.loaded < self.refresh:
+                return self.revoked
+        revoked = dict(TokenRevocation.objects.filter(
+            revoked__gt=self.horizon()
+        ).values_list('user_id', 'revoked'))
+        with self.lock:
+            self.revoked, self.loaded = revoked, now
+        return revoked
+
+    def get(self, user_id):
+        return self.load().get(user_id)
+
+    def revoke(self, user_id):
+        revoked = time.time()
+        TokenRevocation.objects.update_or_create(
+            user_id=user_id, defaults={'revoked': revoked}
+        )
+        TokenRevocation.objects.filter(revoked__lte=self.horizon()).delete()
+        with self.lock:
+            self.revoked[user_id] = revoked
+
+
+revocations = RevocationList(getattr(settings, 'JWT_REVOCATION_REFRESH', 5))
+
+
+def revoke_user_tokens(user_id):
+    """
+    Помечает выданные пользователю токены устаревшими.
+
+    Такие токены больше не проходят по быстрому пути и проверяются
+    по базе, поэтому смена роли и удаление действуют сразу.
+    """
+    revocations.revoke(user_id)
+
+
+def is_revoked(validated_token):
+    revoked = revocations.get(validated_token[api_settings.USER_ID_CLAIM])
+    return revoked is not None and validated_token.get('iat', 0) <= revoked
+
+
+class TokenCache:
+    """
+    LRU-кэш проверенных токенов в памяти процесса.
+
+    Запись живет не дольше claim ``exp`` токена; при переполнении
+    вытесняется давно не использованный токен.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.tokens = OrderedDict()
+            self.hits = self.misses = self.evictions = 0
+
+    def get(self, raw_token):
+        with self.lock:
+            item = self.tokens.get(raw_token)
+            if item is None:
+                self.misses += 1
+                return None
+            token, expires = item
+            if time.time() >= expires:
+                del self.tokens[raw_token]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self.tokens.move_to_end(raw_token)
+            self.hits += 1
+            return token
+
+    def set(self, raw_token, token):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.tokens[raw_token] = (token, token['exp'])
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > self.maxsize:
+                self.tokens.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.tokens),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+token_cache = TokenCache(getattr(settings, 'JWT_TOKEN_CACHE_SIZE', 10000))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к базе.
+
+    Пользователь собирается из claims токена: этого достаточно для
+    проверки прав и для подстановки автора в отзывы и комментарии.
+    Старые токены без claims и отозванные токены проверяются по базе.
+    Проверенные подписи кэшируются в ``token_cache`` до истечения токена.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if (
+            any(claim not in validated_token for claim in TOKEN_CLAIMS)
+            or is_revoked(validated_token)
+        ):
+            return super().get_user(validated_token)
+        user = User(
+            id=validated_token[api_settings.USER_ID_CLAIM],
+            **{claim: validated_token[claim] for claim in TOKEN_CLAIMS}
+        )
+        user._state.adding = False
+        return user
@@ -0,0 +1,94 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from reviews.models import Version
+
+RESPONSE_KEY = 'api:response:{}'
+
+# Входит в каждый отпечаток; сдвигается, когда данные менялись в обход
+# сигналов: после migrate и flush, загрузки и генерации данных.
+EPOCH_KEY = 'epoch'
+
+
+def version_key(model):
+    return model._meta.label_lower
+
+
+def title_key(title_id):
+    """Версия отзывов и комментариев одного произведения."""
+    return f'reviews.title:{int(title_id)}'
+
+
+def get_versions(keys):
+    """
+    Текущие версии ключей одним запросом к общей таблице.
+
+    У ключа без записи версия 0: чтение ничего не пишет в базу.
+    """
+    values = dict(
+        Version.objects.filter(key__in=keys).values_list('key', 'value')
+    )
+    return [values.get(key, 0) for key in keys]
+
+
+def bump_key(key):
+    """Сдвигает версию ключа атомарным UPDATE value = value + 1."""
+    if Version.objects.filter(key=key).update(value=F('value') + 1):
+        return
+    try:
+        with transaction.atomic():
+            # Начальное значение от времени: после очистки таблицы
+            # новая версия не совпадет со старыми ключами ответов.
+            Version.objects.create(key=key, value=time.time_ns())
+    except IntegrityError:
+        # Запись одновременно создал параллельный запрос.
+        Version.objects.filter(key=key).update(value=F('value') + 1)
+
+
+def bump_keys(keys):
+    """Сдвигает версии нескольких ключей двумя запросами."""
+    keys = set(keys)
+    if not keys:
+        return
+    Version.objects.filter(key__in=keys).update(value=F('value') + 1)
+    # Существующие ключи уже сдвинуты, вставятся только новые.
+    Version.objects.bulk_create(
+        (Version(key=key, value=time.time_ns()) for key in keys),
+        ignore_conflicts=True,
+    )
+
+
+def bump_epoch():
+    """Инвалидирует все ответы и ETag."""
+    bump_key(EPOCH_KEY)
+
+
+def bump_version(model):
+    """Инвалидирует закэшированные ответы, зависящие от модели."""
+    bump_key(version_key(model))
+
+
+def response_fingerprint(request, keys):
+    """
+    Хэш полного адреса, формата ответа и версий ключей; один запрос к БД.
+
+    Схема и хост входят в адрес: кэшированные списки содержат абсолютные
+    ссылки next и previous.
+    """
+    versions = ':'.join(
+        str(version) for version in get_versions([EPOCH_KEY, *keys])
+    )
+    raw = '|'.join((
+        request.build_absolute_uri(),
+        request.accepted_media_type or '',
+        versions,
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_cache_timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 60 * 15)
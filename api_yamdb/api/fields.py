@@ -0,0 +1,77 @@
+from rest_framework import serializers
+
+
+def load_by_slug(queryset, slug_field, slugs):
+    """Словарь slug -> объект для найденных slug'ов, один запрос IN."""
+    return {
+        getattr(obj, slug_field): obj
+        for obj in queryset.filter(**{f'{slug_field}__in': set(slugs)})
+    }
+
+
+class BatchSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который умеет брать объекты из заранее загруженных.
+
+    После preload() все значения ищутся в словаре без запросов к БД:
+    так пакет элементов проверяется одним запросом на всех.
+    """
+    preloaded = None
+
+    def preload(self, slugs):
+        self.preloaded = load_by_slug(
+            self.get_queryset(), self.slug_field, slugs
+        )
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, str):
+            self.fail('invalid')
+        if data not in self.preloaded:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return self.preloaded[data]
+
+
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """
+    Список slug'ов, который разрешается одним запросом IN.
+
+    В отличие от SlugRelatedField(many=True) не делает запрос на каждый
+    slug и сообщает обо всех ненайденных slug'ах сразу.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Объекты со slug {slugs} не найдены.',
+        'invalid': 'Slug должен быть строкой.',
+    }
+
+    def __init__(self, slug_field, queryset=None, read_only=False,
+                 **kwargs):
+        child_relation = BatchSlugRelatedField(
+            slug_field=slug_field, queryset=queryset, read_only=read_only
+        )
+        super().__init__(
+            child_relation=child_relation, read_only=read_only, **kwargs
+        )
+        self.slug_field = slug_field
+
+    def preload(self, slugs):
+        self.child_relation.preload(slugs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        if not all(isinstance(slug, str) for slug in data):
+            self.fail('invalid')
+        slugs = list(dict.fromkeys(data))
+        found = self.child_relation.preloaded
+        if found is None:
+            found = load_by_slug(
+                self.child_relation.get_queryset(), self.slug_field, slugs
+            )
+        missing = [slug for slug in slugs if slug not in found]
+        if missing:
+            self.fail('does_not_exist', slugs=', '.join(missing))
+        return [found[slug] for slug in slugs]
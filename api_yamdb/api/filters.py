@@ -1,6 +1,18 @@
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """Сортировка с id последним ключом, чтобы страницы не пересекались."""
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        tiebreaker = '-pk' if ordering[0].startswith('-') else 'pk'
+        return qs.order_by(*ordering, tiebreaker)
 
 
 class TitlesFilter(filters.FilterSet):
@@ -17,6 +29,18 @@ class TitlesFilter(filters.FilterSet):
         field_name='genre__slug',
         lookup_expr='contains'
     )
+    q = filters.CharFilter(method='filter_q')
+    # Сохраненные rating и rating_count покрыты индексами (поле, id).
+    ordering = StableOrderingFilter(fields=(
+        ('rating', 'rating'),
+        ('rating_count', 'review_count'),
+        ('name', 'name'),
+        ('year', 'year'),
+    ))
+
+    def filter_q(self, queryset, name, value):
+        """Полнотекстовый поиск с сортировкой по релевантности."""
+        return search_titles(queryset, value)
 
     class Meta:
         model = Title
@@ -0,0 +1,390 @@
+import io
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+from django.test.utils import override_settings
+
+from api.authentication import YamdbAccessToken, token_cache
+from api.querycount import count_queries
+from api_yamdb.wsgi import application
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+DEFAULT_MIX = (
+    'titles_list=30,titles_filter=15,title_detail=10,reviews_list=15,'
+    'comments_list=10,signup=5,token=5,review_post=10'
+)
+
+BENCH_USERS = 50
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered) + 0.5) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+@contextmanager
+def keep_connections():
+    """
+    Не дает обработчику WSGI закрывать соединение после запроса.
+
+    Иначе соединение закроется внутри transaction.atomic(), как и при
+    работе тестового клиента Django.
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        yield
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        try:
+            mix[name.strip()] = float(weight)
+        except ValueError:
+            raise CommandError(f'Некорректный элемент --mix: {item!r}')
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет смесь HTTP-запросов через WSGI-приложение, считает '
+        'p50/p95/p99, пропускную способность и запросы к БД и сравнивает '
+        'результат с сохраненным baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--warmup', type=int, default=50)
+        parser.add_argument('--mix', default=DEFAULT_MIX)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Куда записать результаты в формате JSON.'
+        )
+        parser.add_argument(
+            '--baseline', help='JSON с результатами предыдущего прогона.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 и падение пропускной способности '
+                 'относительно baseline (0.2 = 20%%).'
+        )
+        parser.add_argument(
+            '--throttle', action='store_true',
+            help='Не отключать ограничения частоты запросов.'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Завершиться с ошибкой, если найдены регрессии.'
+        )
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        unknown = set(mix) - set(self.get_scenarios())
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        if not Title.objects.exists() or not Review.objects.exists():
+            raise CommandError(
+                'Нет данных: сначала выполните generate_dataset.'
+            )
+        self.rng = random.Random(options['seed'])
+        self.counter = 0
+        token_cache.clear()
+
+        rest_framework = dict(settings.REST_FRAMEWORK)
+        if not options['throttle']:
+            # Все запросы идут с одного адреса и быстро исчерпали бы
+            # корзины signup/token/writes.
+            rest_framework['DEFAULT_THROTTLE_RATES'] = dict.fromkeys(
+                rest_framework.get('DEFAULT_THROTTLE_RATES', {})
+            )
+        # Все записи откатываются, чтобы повторные прогоны шли
+        # на одинаковых данных.
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            REST_FRAMEWORK=rest_framework,
+        ), keep_connections(), transaction.atomic():
+            self.prepare()
+            samples = self.run(mix, options['warmup'], options['requests'])
+            transaction.set_rollback(True)
+
+        results = self.summarize(samples, options)
+        self.print_results(results)
+        regressions = []
+        if options['baseline']:
+            regressions = self.compare(results, options)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if regressions and options['fail_on_regression']:
+            raise CommandError(
+                f'Регрессии производительности: {len(regressions)}'
+            )
+
+    def prepare(self):
+        self.title_ids = list(Title.objects.values_list('pk', flat=True))
+        self.review_pairs = list(
+            Review.objects.values_list('title_id', 'pk')
+        )
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.categories = list(
+            Category.objects.values_list('slug', flat=True)
+        )
+        run_id = time.time_ns()
+        User.objects.bulk_create(
+            User(
+                username=f'bench_{run_id}_{index}',
+                email=f'bench_{run_id}_{index}@yamdb.fake',
+            )
+            for index in range(BENCH_USERS)
+        )
+        self.users = list(User.objects.filter(
+            username__startswith=f'bench_{run_id}_'
+        ))
+        # Токены с claims, как выдает /auth/token/: запросы идут по
+        # быстрому пути аутентификации без чтения пользователя.
+        self.tokens = [
+            str(YamdbAccessToken.for_user(user)) for user in self.users
+        ]
+        self.codes = [
+            default_token_generator.make_token(user) for user in self.users
+        ]
+        self.run_id = run_id
+
+    def get_scenarios(self):
+        return {
+            'titles_list': self.titles_list,
+            'titles_filter': self.titles_filter,
+            'title_detail': self.title_detail,
+            'reviews_list': self.reviews_list,
+            'comments_list': self.comments_list,
+            'signup': self.signup,
+            'token': self.token,
+            'review_post': self.review_post,
+        }
+
+    def titles_list(self):
+        offset = self.rng.randrange(0, max(1, len(self.title_ids)), 10)
+        return 'GET', f'/api/v1/titles/?offset={offset}', None, None
+
+    def titles_filter(self):
+        query = f'genre={self.rng.choice(self.genres)}'
+        if self.categories and self.rng.random() < 0.5:
+            query += f'&category={self.rng.choice(self.categories)}'
+        return 'GET', f'/api/v1/titles/?{query}', None, None
+
+    def title_detail(self):
+        title_id = self.rng.choice(self.title_ids)
+        return 'GET', f'/api/v1/titles/{title_id}/', None, None
+
+    def reviews_list(self):
+        title_id, _ = self.rng.choice(self.review_pairs)
+        return 'GET', f'/api/v1/titles/{title_id}/reviews/', None, None
+
+    def comments_list(self):
+        title_id, review_id = self.rng.choice(self.review_pairs)
+        return (
+            'GET',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            None, None
+        )
+
+    def signup(self):
+        name = f'signup_{self.run_id}_{self.counter}'
+        body = {'username': name, 'email': f'{name}@yamdb.fake'}
+        return 'POST', '/api/v1/auth/signup/', body, None
+
+    def token(self):
+        index = self.rng.randrange(len(self.users))
+        body = {
+            'username': self.users[index].username,
+            'confirmation_code': self.codes[index],
+        }
+        return 'POST', '/api/v1/auth/token/', body, None
+
+    def review_post(self):
+        # Каждый пользователь проходит произведения по порядку,
+        # поэтому пара (автор, произведение) не повторяется.
+        index = self.counter % len(self.users)
+        title_id = self.title_ids[
+            (self.counter // len(self.users)) % len(self.title_ids)
+        ]
+        body = {'text': 'Отзыв из бенчмарка', 'score': self.rng.randint(1, 10)}
+        return (
+            'POST', f'/api/v1/titles/{title_id}/reviews/', body,
+            {'HTTP_AUTHORIZATION': f'Bearer {self.tokens[index]}'}
+        )
+
+    def call(self, method, path, body=None, headers=None):
+        """Выполняет запрос через WSGI-приложение и возвращает статус."""
+        path, _, query = path.partition('?')
+        payload = json.dumps(body).encode() if body is not None else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'wsgi.input': io.BytesIO(payload),
+        }
+        environ.update(headers or {})
+        setup_testing_defaults(environ)
+        status = []
+
+        def start_response(status_line, response_headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+
+        response = application(environ, start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        return status[0]
+
+    def run(self, mix, warmup, total):
+        scenarios = self.get_scenarios()
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        samples = defaultdict(list)
+        started = None
+        for number in range(warmup + total):
+            if number == warmup:
+                started = time.perf_counter()
+            name = self.rng.choices(names, weights)[0]
+            self.counter += 1
+            request = scenarios[name]()
+            with count_queries() as queries:
+                request_started = time.perf_counter()
+                status = self.call(*request)
+                elapsed = time.perf_counter() - request_started
+            if number >= warmup:
+                samples[name].append((elapsed, queries.count, status))
+        samples['__wall__'] = time.perf_counter() - (
+            started or time.perf_counter()
+        )
+        return samples
+
+    def summarize(self, samples, options):
+        wall = samples.pop('__wall__')
+        endpoints = {}
+        for name, rows in sorted(samples.items()):
+            latencies = [row[0] * 1000 for row in rows]
+            endpoints[name] = {
+                'requests': len(rows),
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'mean_ms': round(statistics.mean(latencies), 3),
+                'rps': round(len(rows) / (sum(latencies) / 1000), 1),
+                'queries_per_request': round(
+                    statistics.mean(row[1] for row in rows), 2
+                ),
+                'errors': sum(1 for row in rows if row[2] >= 500),
+            }
+        total = sum(item['requests'] for item in endpoints.values())
+        return {
+            'meta': {
+                'requests': total,
+                'warmup': options['warmup'],
+                'seed': options['seed'],
+                'mix': options['mix'],
+                'titles': len(self.title_ids),
+                'reviews': len(self.review_pairs),
+            },
+            'total': {
+                'wall_s': round(wall, 3),
+                'rps': round(total / wall, 1) if wall else 0,
+            },
+            'jwt_cache': token_cache.stats(),
+            'endpoints': endpoints,
+        }
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"endpoint":<15}{"n":>7}{"p50":>10}{"p95":>10}{"p99":>10}'
+            f'{"rps":>9}{"queries":>9}'
+        )
+        for name, item in results['endpoints'].items():
+            self.stdout.write(
+                f'{name:<15}{item["requests"]:>7}{item["p50_ms"]:>10.2f}'
+                f'{item["p95_ms"]:>10.2f}{item["p99_ms"]:>10.2f}'
+                f'{item["rps"]:>9.0f}{item["queries_per_request"]:>9.1f}'
+            )
+        self.stdout.write(
+            f'Всего: {results["meta"]["requests"]} запросов, '
+            f'{results["total"]["rps"]} запросов/с'
+        )
+
+    def compare(self, results, options):
+        """
+        Сравнивает с baseline p95, пропускную способность и число запросов.
+
+        Сравнение по каждому сценарию печатается и сохраняется в
+        ``results['comparison']``.
+        """
+        with open(options['baseline'], encoding='utf-8') as file:
+            baseline = json.load(file)['endpoints']
+        regressions = []
+        comparison = results['comparison'] = {}
+        for name, item in results['endpoints'].items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            comparison[name] = {
+                'rps': [base['rps'], item['rps']],
+                'p95_ms': [base['p95_ms'], item['p95_ms']],
+                'queries_per_request': [
+                    base['queries_per_request'], item['queries_per_request']
+                ],
+            }
+            change = (
+                (item['rps'] / base['rps'] - 1) * 100 if base['rps'] else 0
+            )
+            self.stdout.write(
+                f'{name}: {base["rps"]} -> {item["rps"]} запросов/с '
+                f'({change:+.0f}%), p95 {base["p95_ms"]} -> '
+                f'{item["p95_ms"]} мс, запросов к БД '
+                f'{base["queries_per_request"]} -> '
+                f'{item["queries_per_request"]}'
+            )
+            limit = base['p95_ms'] * (1 + options['threshold'])
+            if item['p95_ms'] > limit:
+                regressions.append(
+                    f'{name}: p95 {base["p95_ms"]} -> {item["p95_ms"]} мс'
+                )
+            if item['rps'] < base['rps'] * (1 - options['threshold']):
+                regressions.append(
+                    f'{name}: пропускная способность {base["rps"]} -> '
+                    f'{item["rps"]} запросов/с'
+                )
+            if item['queries_per_request'] > base['queries_per_request']:
+                regressions.append(
+                    f'{name}: запросов к БД {base["queries_per_request"]} '
+                    f'-> {item["queries_per_request"]}'
+                )
+        for line in regressions:
+            self.stdout.write(self.style.WARNING(line))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+        return regressions
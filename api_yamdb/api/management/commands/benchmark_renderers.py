@@ -0,0 +1,138 @@
+import io
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, MessagePackRenderer, orjson
+
+WORDS = (
+    'тень', 'город', 'ветер', 'ночь', 'море', 'звезда', 'дорога', 'огонь',
+)
+
+
+def titles_page(size):
+    """Страница списка произведений, как ее отдает TitleDisplaySerializer."""
+    genres = [{'name': word.capitalize(), 'slug': word} for word in WORDS]
+    return {
+        'count': size * 10,
+        'next': 'http://testserver/api/v1/titles/?limit=10&offset=10',
+        'previous': None,
+        'results': [
+            {
+                'id': index,
+                'name': f'{WORDS[index % 8]} {WORDS[index * 3 % 8]}',
+                'year': 1950 + index % 70,
+                'rating': index % 10 or None,
+                'description': ' '.join(WORDS * 6),
+                'genre': genres[:1 + index % 3],
+                'category': {'name': 'Фильм', 'slug': 'movie'},
+            }
+            for index in range(size)
+        ],
+    }
+
+
+def reviews_page(size):
+    """Страница отзывов с датами, которые DRF уже перевел в строки."""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return {
+        'count': size,
+        'next': None,
+        'previous': None,
+        'results': [
+            {
+                'id': index,
+                'text': ' '.join(WORDS * 15),
+                'author': f'user{index}',
+                'score': 1 + index % 10,
+                'pub_date': (start + timedelta(minutes=index)).isoformat(),
+                'title': index // 10,
+            }
+            for index in range(size)
+        ],
+    }
+
+
+PAGES = {'titles': titles_page, 'reviews': reviews_page}
+
+
+def measure(function, repeat):
+    """Лучшее время одного вызова из repeat, в миллисекундах."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга больших страниц JSONRenderer, '
+        'FastJSONRenderer и MessagePackRenderer и разбора JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--output', help='Куда записать результаты в формате JSON.'
+        )
+
+    def handle(self, *args, **options):
+        if options['items'] <= 0 or options['repeat'] <= 0:
+            raise CommandError('--items и --repeat должны быть больше нуля.')
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson не установлен: FastJSONRenderer использует json.'
+            ))
+        renderers = {
+            'json': JSONRenderer(),
+            'fast_json': FastJSONRenderer(),
+            'msgpack': MessagePackRenderer(),
+        }
+        results = {}
+        for page_name, build in PAGES.items():
+            data = build(options['items'])
+            page = results[page_name] = {}
+            for name, renderer in renderers.items():
+                body = renderer.render(data)
+                page[name] = {
+                    'render_ms': round(measure(
+                        lambda: renderer.render(data), options['repeat']
+                    ), 3),
+                    'bytes': len(body),
+                }
+            body = renderers['json'].render(data)
+            page['json']['parse_ms'] = round(measure(
+                lambda: json.loads(body), options['repeat']
+            ), 3)
+            page['fast_json']['parse_ms'] = round(measure(
+                lambda: FastJSONParser().parse(io.BytesIO(body)),
+                options['repeat']
+            ), 3)
+        self.print_results(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"page":<9}{"renderer":<11}{"render ms":>11}{"parse ms":>10}'
+            f'{"bytes":>10}'
+        )
+        for page_name, page in results.items():
+            base = page['json']['render_ms']
+            for name, item in page.items():
+                parse = item.get('parse_ms')
+                self.stdout.write(
+                    f'{page_name:<9}{name:<11}{item["render_ms"]:>11.2f}'
+                    f'{parse if parse is not None else "-":>10}'
+                    f'{item["bytes"]:>10}'
+                    f'  x{base / item["render_ms"]:.1f}'
+                )
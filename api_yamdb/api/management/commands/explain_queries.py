@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from reviews.models import Comment
+
+DUMMY_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+def is_full_scan(detail):
+    """Строка плана SQLite без индекса: «SCAN reviews_review»."""
+    return detail.startswith('SCAN ') and 'INDEX' not in detail
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет GET-запросы к основным эндпоинтам, строит EXPLAIN QUERY '
+        'PLAN для каждого SQL-запроса и отмечает полные сканирования таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Завершиться с ошибкой, если найдены полные сканирования.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        comment = Comment.objects.select_related('review').first()
+        if comment is None:
+            raise CommandError(
+                'Нет данных: сначала выполните generate_dataset.'
+            )
+        scans = []
+        # Без кеша ответов каждый запрос действительно идет в БД.
+        with override_settings(CACHES=DUMMY_CACHE):
+            client = Client()
+            for path in self.get_paths(comment):
+                scans.extend(self.explain(client, path))
+        if scans:
+            self.stdout.write(self.style.WARNING(
+                f'Полных сканирований: {len(scans)}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                'Полных сканирований нет.'
+            ))
+        if scans and options['fail_on_scan']:
+            raise CommandError(f'Полных сканирований: {len(scans)}')
+
+    def get_paths(self, comment):
+        review = comment.review
+        title_path = f'/api/v1/titles/{review.title_id}/'
+        review_path = f'{title_path}reviews/{review.pk}/'
+        return (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            title_path,
+            f'{title_path}reviews/',
+            review_path,
+            f'{review_path}comments/',
+            f'{review_path}comments/{comment.pk}/',
+        )
+
+    def explain(self, client, path):
+        """Печатает планы запросов эндпоинта и возвращает сканирования."""
+        with CaptureQueriesContext(connection) as context:
+            client.get(path)
+        self.stdout.write(self.style.MIGRATE_HEADING(path))
+        scans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                self.stdout.write(f'  {sql}')
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    if is_full_scan(detail):
+                        scans.append((path, detail))
+                        self.stdout.write(self.style.WARNING(
+                            f'    {detail}  <- полное сканирование'
+                        ))
+                    else:
+                        self.stdout.write(f'    {detail}')
+        return scans
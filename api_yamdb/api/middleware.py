@@ -0,0 +1,26 @@
+from django.conf import settings
+
+from api.querycount import count_queries
+
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+QUERY_TIME_HEADER = 'X-DB-Query-Time'
+
+
+class QueryCountMiddleware:
+    """
+    Добавляет в ответ число SQL-запросов и их суммарное время в мс.
+
+    Включается настройкой QUERY_COUNT_HEADER, по умолчанию только в DEBUG.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_COUNT_HEADER', False):
+            return self.get_response(request)
+        with count_queries() as counter:
+            response = self.get_response(request)
+        response[QUERY_COUNT_HEADER] = str(counter.count)
+        response[QUERY_TIME_HEADER] = f'{counter.duration * 1000:.2f}'
+        return response
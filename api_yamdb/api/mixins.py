@@ -1,5 +1,11 @@
-from rest_framework import mixins, viewsets, filters
+from rest_framework import mixins, serializers, status, viewsets, filters
+from rest_framework.response import Response
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.cache import parse_etags
 
+from .cache import (RESPONSE_KEY, get_cache_timeout, response_fingerprint,
+                    version_key)
 from .permissions import IsAdminOrSuperUser
 
 
@@ -12,3 +18,295 @@ class DestroyCreateListMixins(mixins.CreateModelMixin,
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+
+
+class VersionedMixin:
+    """
+    Отпечаток запроса из версий данных, от которых зависит ответ.
+
+    Версии моделей из ``cache_models`` хранятся в базе и общие для всех
+    воркеров. Отпечаток считается один раз за запрос: его используют
+    и кэш ответов, и ETag.
+    """
+    cache_models = ()
+
+    def get_version_keys(self):
+        return [version_key(model) for model in self.cache_models]
+
+    def get_fingerprint(self, request):
+        if not hasattr(self, '_fingerprint'):
+            self._fingerprint = response_fingerprint(
+                request, self.get_version_keys()
+            )
+        return self._fingerprint
+
+
+class CachedListMixin(VersionedMixin):
+    """
+    Кэширует данные ответов list.
+
+    Ключ включает версии моделей из ``cache_models``, поэтому запись
+    в любую из них делает старые ответы недостижимыми. Сами ответы
+    хранятся в кэше ``default``.
+    """
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = RESPONSE_KEY.format(self.get_fingerprint(request))
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, get_cache_timeout())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedReadMixin(CachedListMixin):
+    """Кэширует данные ответов list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin(VersionedMixin):
+    """
+    Отвечает 304 Not Modified на GET с совпадающим If-None-Match.
+
+    ETag строится из версий данных одним запросом, поэтому при
+    совпадении не выполняются ни выборка, ни сериализация. Вложенные
+    ресурсы сужают ``get_version_keys`` до версии родителя.
+    ``If-None-Match: *`` совпадает только с существующим ресурсом,
+    поэтому для него ответ сначала строится: отсутствующий дает 404.
+    """
+
+    def get_etag(self, request):
+        return '"{}"'.format(self.get_fingerprint(request))
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        not_modified = Response(
+            status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+        )
+        if etag in etags:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        if '*' in etags:
+            return not_modified
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class EagerLoadingMixin:
+    """
+    Подгружает связи, объявленные сериализатором.
+
+    Сериализатор перечисляет нужные ему связи в ``Meta.select_related``
+    и ``Meta.prefetch_related``, а вьюсет применяет их к queryset, чтобы
+    страница списка стоила постоянное число запросов.
+    """
+
+    def get_eager_relations(self):
+        """Связи (select_related, prefetch_related) для этого запроса."""
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        return (
+            getattr(meta, 'select_related', ()),
+            getattr(meta, 'prefetch_related', ()),
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select_related, prefetch_related = self.get_eager_relations()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class NestedParentMixin:
+    """
+    Находит родительские объекты вложенного ресурса один раз за запрос.
+
+    ``resolve_parents`` возвращает словарь родителей, загруженных одним
+    запросом. Вьюха создается на каждый запрос, поэтому результат
+    хранится на ней и попадает в контекст сериализатора.
+    """
+
+    def resolve_parents(self):
+        raise NotImplementedError
+
+    def get_parents(self):
+        if not hasattr(self, '_parents'):
+            self._parents = self.resolve_parents()
+        return self._parents
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.get_parents())
+        return context
+
+
+class CompactRefsMixin:
+    """
+    Выбор представления ссылок на родителя параметром ``?refs=``.
+
+    full - как раньше (имя произведения, текст отзыва в каждой строке),
+    id - только id родителя, parent - ссылки в строках нет, а родители
+    один раз выводятся блоком ``parent`` страницы списка. Связи из
+    ``Meta.compact_refs`` сериализатора в компактных режимах не
+    загружаются. Рассчитан на вьюсеты с NestedParentMixin.
+    """
+    refs_query_param = 'refs'
+    refs_modes = ('full', 'id', 'parent')
+    parent_fields = {}
+
+    def get_refs_mode(self):
+        mode = self.request.query_params.get(self.refs_query_param, 'full')
+        if mode not in self.refs_modes:
+            raise serializers.ValidationError({
+                self.refs_query_param: [
+                    f'Допустимые значения: {", ".join(self.refs_modes)}.'
+                ]
+            })
+        if mode == 'parent' and self.action != 'list':
+            # У одного объекта нет страницы, куда вывести блок parent.
+            return 'id'
+        return mode
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['refs'] = self.get_refs_mode()
+        return context
+
+    def get_eager_relations(self):
+        select_related, prefetch_related = super().get_eager_relations()
+        if self.get_refs_mode() == 'full':
+            return select_related, prefetch_related
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        compact = getattr(meta, 'compact_refs', ())
+        return (
+            tuple(name for name in select_related if name not in compact),
+            prefetch_related,
+        )
+
+    def get_parent_block(self):
+        parents = self.get_parents()
+        return {
+            name: {field: getattr(parents[name], field) for field in fields}
+            for name, fields in self.parent_fields.items()
+        }
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.get_refs_mode() == 'parent':
+            response.data['parent'] = self.get_parent_block()
+        return response
+
+
+class SparseFieldsMixin:
+    """
+    Выбор полей ответа параметрами ``?fields=a,b`` и ``?omit=c``.
+
+    Работает для GET: сериализатор оставляет только нужные поля, а
+    queryset загружает только их столбцы (only()) и не подгружает связи
+    неполученных полей. Рассчитан на вьюсеты с EagerLoadingMixin.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def parse_field_list(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    def get_sparse_fields(self):
+        """Пара (fields, omit) или None, если выбор полей не запрошен."""
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        fields = self.parse_field_list(self.fields_query_param)
+        omit = self.parse_field_list(self.omit_query_param)
+        if fields is None and omit is None:
+            return None
+        return fields, omit or set()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        sparse = self.get_sparse_fields()
+        if sparse is not None:
+            context['fields'], context['omit'] = sparse
+        return context
+
+    def get_requested_sources(self):
+        """Корневые атрибуты модели, которые читают оставшиеся поля."""
+        return {
+            field.source.split('.')[0]
+            for field in self.get_serializer().fields.values()
+        }
+
+    def get_eager_relations(self):
+        select_related, prefetch_related = super().get_eager_relations()
+        if self.get_sparse_fields() is None:
+            return select_related, prefetch_related
+        sources = self.get_requested_sources()
+        return (
+            tuple(name for name in select_related
+                  if name.split('__')[0] in sources),
+            tuple(name for name in prefetch_related
+                  if name.split('__')[0] in sources),
+        )
+
+    def get_only_fields(self, model):
+        """
+        Поля модели для only() или None, если сузить выборку нельзя.
+
+        Добавляются первичный ключ и поля сортировки пагинации: курсор
+        читает их у последнего объекта страницы.
+        """
+        names = {model._meta.pk.name}
+        names.update(
+            name.lstrip('-')
+            for name in getattr(self.pagination_class, 'ordering', ())
+            if name.lstrip('-') != 'pk'
+        )
+        for source in self.get_requested_sources():
+            if source == '*':
+                return None
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if field.concrete and not field.many_to_many:
+                names.add(source)
+            elif not field.many_to_many:
+                return None
+        return names
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_sparse_fields() is None:
+            return queryset
+        names = self.get_only_fields(queryset.model)
+        if names is not None:
+            queryset = queryset.only(*names)
+        return queryset
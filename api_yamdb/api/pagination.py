@@ -0,0 +1,252 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as FieldValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_value(value):
+    """Даты - полным ISO, с микросекундами, остальное - строкой."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по всем ключам сортировки.
+
+    Курсор хранит значения всех полей ``ordering`` у крайнего объекта
+    страницы, и следующая страница выбирается условием
+    ``(a, b) > (x, y)`` без OFFSET, поэтому любая страница стоит
+    одинаково, даже внутри длинной серии равных значений первого ключа.
+    Последний ключ должен быть уникальным. NULL считается меньше любого
+    значения.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('-pk',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def get_keys(self, model):
+        """Пары (поле модели, по убыванию) для ключей сортировки."""
+        keys = []
+        for name in self.ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            field = (
+                model._meta.pk if name == 'pk'
+                else model._meta.get_field(name)
+            )
+            keys.append((field, descending))
+        return keys
+
+    def order_by(self, keys, reverse):
+        expressions = []
+        for field, descending in keys:
+            if descending != reverse:
+                expressions.append(F(field.attname).desc(
+                    nulls_last=True if field.null else None
+                ))
+            else:
+                expressions.append(F(field.attname).asc(
+                    nulls_first=True if field.null else None
+                ))
+        return expressions
+
+    def after(self, field, value, descending):
+        """Условие «строго после value» для одного ключа."""
+        name = field.attname
+        if not descending:
+            if value is None:
+                return Q(**{f'{name}__isnull': False})
+            return Q(**{f'{name}__gt': value})
+        if value is None:
+            return Q(pk__in=[])
+        condition = Q(**{f'{name}__lt': value})
+        if field.null:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def equal(self, field, value):
+        if value is None:
+            return Q(**{f'{field.attname}__isnull': True})
+        return Q(**{field.attname: value})
+
+    def position_filter(self, keys, position, reverse):
+        """(a > x) OR (a = x AND b > y) OR ... по всем ключам."""
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (field, descending), value in zip(keys, position):
+            condition |= prefix & self.after(
+                field, value, descending != reverse
+            )
+            prefix &= self.equal(field, value)
+        return condition
+
+    def encode_cursor(self, position, reverse):
+        raw = json.dumps(
+            {'p': position, 'r': int(reverse)}, default=encode_value
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request, keys):
+        """(позиция, назад) из ``?cursor=``; None для первой страницы."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return self.parse_position(keys, data['p']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error,
+                FieldValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, keys, values):
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError('Число значений курсора не совпадает с ключами.')
+        return [
+            None if value is None else field.to_python(value)
+            for (field, _), value in zip(keys, values)
+        ]
+
+    def get_position(self, keys, obj):
+        return [
+            field.get_prep_value(getattr(obj, field.attname))
+            for field, _ in keys
+        ]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        keys = self.get_keys(queryset.model)
+        cursor = self.decode_cursor(request, keys)
+        reverse = cursor is not None and cursor[1]
+        queryset = queryset.order_by(*self.order_by(keys, reverse))
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.position_filter(keys, cursor[0], reverse)
+            )
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        self.next_position = (
+            self.get_position(keys, page[-1]) if has_next and page else None
+        )
+        self.previous_position = (
+            self.get_position(keys, page[0]) if has_previous and page
+            else None
+        )
+        return page
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param,
+            self.encode_cursor(position, reverse)
+        )
+
+    def get_next_link(self):
+        return self.get_link(self.next_position, False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_position, True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class OptionalCursorPagination(BasePagination):
+    """
+    Пагинация с курсором по запросу.
+
+    Без параметра ``cursor`` работает обычная пагинация ``fallback_class``.
+    Если передан ``?cursor=`` (в том числе пустой - первая страница),
+    используется KeysetPagination: стоимость любой страницы одинакова,
+    так как нет OFFSET и COUNT(*). Курсор идет по сортировке, которую
+    задал фильтр (``?ordering=``), а без нее - по ``ordering``.
+    """
+    fallback_class = PageNumberPagination
+    cursor_query_param = 'cursor'
+    ordering = ('-pk',)
+
+    def __init__(self):
+        self.paginator = None
+
+    def get_cursor_ordering(self, queryset):
+        query = queryset.query
+        if query.extra_order_by or not all(
+            isinstance(name, str) for name in query.order_by
+        ):
+            # Например, ранг полнотекстового поиска: это не поле модели.
+            raise ValidationError({self.cursor_query_param: [
+                'Курсор нельзя сочетать с этой сортировкой, '
+                'используйте обычную пагинацию.'
+            ]})
+        if not query.order_by:
+            return self.ordering
+        ordering = tuple(query.order_by)
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            tiebreaker = '-pk' if ordering[-1].startswith('-') else 'pk'
+            ordering += (tiebreaker,)
+        return ordering
+
+    def get_cursor_paginator(self, queryset):
+        paginator = KeysetPagination(self.get_cursor_ordering(queryset))
+        paginator.cursor_query_param = self.cursor_query_param
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.paginator = self.get_cursor_paginator(queryset)
+        else:
+            self.paginator = self.fallback_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def get_schema_fields(self, view):
+        return self.fallback_class().get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.fallback_class().get_schema_operation_parameters(view)
+
+
+class TitlePagination(OptionalCursorPagination):
+    """Пагинация произведений: limit/offset или курсор по имени и id."""
+    fallback_class = LimitOffsetPagination
+    ordering = ('name', 'id')
+
+
+class PubDatePagination(OptionalCursorPagination):
+    """Пагинация отзывов и комментариев: номер страницы или курсор."""
+    ordering = ('-pub_date', '-id')
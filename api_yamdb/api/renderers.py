@@ -0,0 +1,66 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSONRenderer экранирует эти символы: они ломают JSON внутри <script>.
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson.
+
+    Результат совпадает с JSONRenderer: даты и Decimal по-прежнему
+    преобразует кодировщик DRF. Без orjson, с отступами и на данных,
+    которые orjson не кодирует (целые больше 64 бит), работает
+    стандартный JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(
+            accepted_media_type or '', renderer_context or {}
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+                PARAGRAPH_SEPARATOR, b'\\u2029'
+            )
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Ответы в MessagePack по заголовку Accept: application/msgpack.
+
+    Кодирует библиотека msgpack; даты и Decimal приводятся так же,
+    как в JSON.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(
+            data, default=self.encoder_class().default, use_bin_type=True
+        )
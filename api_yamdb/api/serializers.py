@@ -1,15 +1,48 @@
+from collections import OrderedDict
+
 from rest_framework import serializers
-from django.db import IntegrityError
+from rest_framework.exceptions import NotFound
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
-from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
 from django.conf import settings
 from rest_framework.validators import UniqueValidator
 
-from reviews.models import Category, Genre, Title, Genre, Review, Comment
+from api.cache import bump_version
+from api.fields import BatchSlugRelatedField, ManySlugRelatedField
+from reviews.models import (Category, Genre, Title, Genre, Review, Comment,
+                            LeaderboardEntry)
+from reviews.utils import bulk_create_with_ids, cache_related, set_m2m
 from users.models import User
 
 
+class SparseFieldsetMixin:
+    """
+    Оставляет в ответе поля из контекста ``fields`` без полей ``omit``.
+
+    Выбор полей передает SparseFieldsMixin вьюсета; вложенные
+    сериализаторы выводятся целиком.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.root
+        if root is not self and getattr(root, 'child', None) is not self:
+            return fields
+        only = self.context.get('fields')
+        omit = self.context.get('omit', set())
+        unknown = ((only or set()) | omit) - set(fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+            })
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if (only is None or name in only) and name not in omit
+        )
+
+
 class RegistrationSerializer(serializers.ModelSerializer):
     """Сериализует запросы на регистрацию."""
     username = serializers.RegexField(
@@ -44,15 +77,39 @@ class RegistrationSerializer(serializers.ModelSerializer):
             )
         return data
 
-    def validate(self, validated_data):
+    def create(self, validated_data):
+        """
+        Возвращает пользователя с этими username и email, создавая его.
+
+        Один SELECT по обоим уникальным полям и при необходимости INSERT;
+        занятые другим пользователем имя или email - ошибка валидации.
+        """
         username = validated_data['username']
         email = validated_data['email']
+        users = list(
+            User.objects.filter(
+                Q(username=username) | Q(email=email)
+            ).order_by()[:2]
+        )
+        if len(users) == 1 and (
+            users[0].username == username and users[0].email == email
+        ):
+            return users[0]
+        if users:
+            raise self.taken_error()
         try:
-            user, _ = User.objects.get_or_create(username=username,
-                                                 email=email)
+            return User.objects.create(username=username, email=email)
         except IntegrityError:
-            raise serializers.ValidationError('Это имя или email уже занято')
-        return validated_data
+            # Параллельная регистрация с тем же именем или email;
+            # транзакцию откатит atomic() во вьюхе.
+            raise self.taken_error()
+
+    def taken_error(self):
+        return serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Это имя или email уже занято'
+            ]
+        })
 
 
 class TokenSerializer(serializers.Serializer):
@@ -69,7 +126,7 @@ class TokenSerializer(serializers.Serializer):
         model = User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализует данные пользователя."""
     username = serializers.RegexField(
         max_length=settings.LIMIT_USERNAME,
@@ -104,7 +161,7 @@ class UserSerializer(serializers.ModelSerializer):
         return data
 
 
-class UserEditSerializer(serializers.ModelSerializer):
+class UserEditSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     username = serializers.RegexField(
         max_length=settings.LIMIT_USERNAME,
         regex=r'^[\w.@+-]+\Z',
@@ -123,7 +180,7 @@ class UserEditSerializer(serializers.ModelSerializer):
         read_only_fields = ('role',)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     class Meta:
         exclude = ['id']
@@ -134,7 +191,7 @@ class CategorySerializer(serializers.ModelSerializer):
         }
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     class Meta:
         exclude = ['id']
@@ -145,13 +202,76 @@ class GenreSerializer(serializers.ModelSerializer):
         }
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
-        many=True,
+class TitleListSerializer(serializers.ListSerializer):
+    """
+    Пакетное создание произведений.
+
+    Категории и жанры всех элементов загружаются двумя запросами,
+    произведения и их связи с жанрами вставляются через bulk_create.
+    """
+
+    def preload(self, data):
+        categories = set()
+        genres = set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get('category'), str):
+                categories.add(item['category'])
+            if isinstance(item.get('genre'), list):
+                genres.update(
+                    slug for slug in item['genre'] if isinstance(slug, str)
+                )
+        self.child.fields['category'].preload(categories)
+        self.child.fields['genre'].preload(genres)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload(data)
+        return super().to_internal_value(data)
+
+    def validate_items(self):
+        """
+        Проверяет элементы по отдельности, не прерываясь на ошибках.
+
+        Возвращает список пар (данные, ошибки) в порядке элементов.
+        """
+        if not isinstance(self.initial_data, list):
+            raise serializers.ValidationError({
+                'non_field_errors': ['Ожидается список произведений.']
+            })
+        self.preload(self.initial_data)
+        results = []
+        for item in self.initial_data:
+            try:
+                results.append((self.child.run_validation(item), None))
+            except serializers.ValidationError as exc:
+                results.append((None, exc.detail))
+        return results
+
+    def create(self, validated_data):
+        genres = [item.pop('genre') for item in validated_data]
+        titles = bulk_create_with_ids(
+            Title, (Title(**item) for item in validated_data)
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        for title, title_genres in zip(titles, genres):
+            cache_related(title, 'genre', title_genres)
+        # bulk_create не отправляет сигналы, кеш ответов сбрасывается здесь.
+        bump_version(Title)
+        return titles
+
+
+class TitleCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    genre = ManySlugRelatedField(
         slug_field='slug',
         queryset=Genre.objects.all()
     )
-    category = serializers.SlugRelatedField(
+    category = BatchSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all(),
         allow_null=False
@@ -162,9 +282,25 @@ class TitleCreateSerializer(serializers.ModelSerializer):
             'id', 'name', 'year', 'description', 'genre', 'category'
         )
         model = Title
+        select_related = ('category',)
+        prefetch_related = ('genre',)
+        list_serializer_class = TitleListSerializer
+
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        title = super().create(validated_data)
+        set_m2m(title, 'genre', genres, created=True)
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            set_m2m(title, 'genre', genres)
+        return title
 
 
-class TitleDisplaySerializer(serializers.ModelSerializer):
+class TitleDisplaySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     genre = CategorySerializer(many=True)
     category = GenreSerializer()
     rating = serializers.IntegerField(read_only=True, required=False)
@@ -174,9 +310,42 @@ class TitleDisplaySerializer(serializers.ModelSerializer):
             'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
         )
         model = Title
+        select_related = ('category',)
+        prefetch_related = ('genre',)
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    position = serializers.IntegerField(read_only=True)
+    title = TitleDisplaySerializer()
+
+    class Meta:
+        fields = ('position', 'value', 'title')
+        model = LeaderboardEntry
+
+
+class CompactRefsSerializerMixin:
+    """
+    Представляет ссылки из ``Meta.compact_refs`` по режиму ``refs``.
+
+    Режим приходит в контексте от CompactRefsMixin: id заменяет ссылку
+    на id родителя без запроса, parent убирает ее из строки.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        mode = self.context.get('refs', 'full')
+        for name in getattr(self.Meta, 'compact_refs', ()):
+            if mode == 'id':
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True
+                )
+            elif mode == 'parent':
+                fields.pop(name, None)
+        return fields
+
+
+class CommentSerializer(SparseFieldsetMixin, CompactRefsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор моделей комментариев."""
     review = serializers.SlugRelatedField(
         slug_field='text',
@@ -190,9 +359,12 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = '__all__'
+        select_related = ('author', 'review')
+        compact_refs = ('review',)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, CompactRefsSerializerMixin,
+                       serializers.ModelSerializer):
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True,
@@ -206,6 +378,8 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
+        select_related = ('author', 'title')
+        compact_refs = ('title',)
 
     def validate_score(self, value):
         if 0 > value > 10:
@@ -213,16 +387,29 @@ class ReviewSerializer(serializers.ModelSerializer):
                 'Оценка по 10-бальной шкале!')
         return value
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(title=title, author=author).exists()
-        ):
-            raise ValidationError(
-                'Больше одного отзыва на title писать нельзя'
-            )
-        return data
+    def create(self, validated_data):
+        """
+        Вставляет отзыв без предварительной проверки на дубликат.
+
+        Один отзыв автора на произведение гарантирует unique_together,
+        нарушение превращается в ошибку валидации. Так нет лишнего
+        запроса и гонки между проверкой и вставкой. Другие нарушения
+        не маскируются: удаленное тем временем произведение дает 404,
+        остальное поднимается дальше.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            title = validated_data['title']
+            if Review.objects.filter(
+                author=validated_data['author'], title=title
+            ).exists():
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Больше одного отзыва на title писать нельзя'
+                    ]
+                })
+            if not Title.objects.filter(pk=title.pk).exists():
+                raise NotFound('Произведение не найдено.')
+            raise
@@ -0,0 +1,87 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from api.authentication import revoke_user_tokens
+from api.cache import bump_epoch, bump_key, bump_keys, bump_version, title_key
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+VERSIONED_MODELS = (Category, Genre, Title, Review)
+
+
+def model_changed(sender, **kwargs):
+    """Сдвигает версию модели при любой записи в нее."""
+    bump_version(sender)
+
+
+def title_genres_changed(sender, **kwargs):
+    bump_version(Title)
+
+
+def title_changed(sender, instance, **kwargs):
+    """Название произведения выводится в его отзывах."""
+    bump_key(title_key(instance.pk))
+
+
+def review_changed(sender, instance, **kwargs):
+    bump_key(title_key(instance.title_id))
+
+
+def comment_changed(sender, instance, **kwargs):
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.objects.filter(pk=instance.review_id).values_list(
+            'title_id', flat=True
+        ).first()
+    # Если отзыв уже удален, версию произведения сдвинуло его удаление.
+    if title_id is not None:
+        bump_key(title_key(title_id))
+
+
+def reset_versions(sender, **kwargs):
+    """После migrate и flush данные могли смениться в обход сигналов."""
+    bump_epoch()
+
+
+def user_saved(sender, instance, created, **kwargs):
+    """
+    Смена роли или имени делает выданные токены устаревшими.
+
+    Имя выводится автором отзывов и комментариев, поэтому при его
+    смене сдвигаются версии произведений, где они оставлены.
+    """
+    if not created and instance.token_fields_changed():
+        revoke_user_tokens(instance.pk)
+        if instance._loaded_token_fields['username'] != instance.username:
+            bump_keys(
+                title_key(title_id) for title_id in {
+                    *Review.objects.filter(author=instance).values_list(
+                        'title_id', flat=True
+                    ),
+                    *Comment.objects.filter(author=instance).values_list(
+                        'review__title_id', flat=True
+                    ),
+                }
+            )
+    instance._loaded_token_fields = {
+        field: getattr(instance, field) for field in User.TOKEN_FIELDS
+    }
+
+
+def user_deleted(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+def connect_signals():
+    for model in VERSIONED_MODELS:
+        post_save.connect(model_changed, sender=model)
+        post_delete.connect(model_changed, sender=model)
+    m2m_changed.connect(title_genres_changed, sender=Title.genre.through)
+    post_save.connect(title_changed, sender=Title)
+    post_delete.connect(title_changed, sender=Title)
+    post_save.connect(review_changed, sender=Review)
+    post_delete.connect(review_changed, sender=Review)
+    post_save.connect(comment_changed, sender=Comment)
+    post_delete.connect(comment_changed, sender=Comment)
+    post_save.connect(user_saved, sender=User)
+    post_delete.connect(user_deleted, sender=User)
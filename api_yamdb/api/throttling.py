@@ -0,0 +1,119 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты по алгоритму token bucket.
+
+    Ставка ``N/период`` из ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``
+    задает емкость корзины N и скорость пополнения N за период.
+    Состояние хранится в кэше ``settings.THROTTLE_CACHE``: LocMemCache
+    для одного процесса, DatabaseCache - общая таблица для нескольких
+    воркеров. Чтение и запись корзины идут под блокировкой на cache.add,
+    поэтому параллельные запросы не расходуют один и тот же токен.
+    """
+    # Ограничиваемые методы; None - все.
+    methods = None
+    # Сколько ждать занятую корзину и через сколько снимается брошенная
+    # блокировка, с.
+    lock_wait = 0.5
+    lock_timeout = 5
+
+    @property
+    def cache(self):
+        alias = getattr(settings, 'THROTTLE_CACHE', 'default')
+        return caches[alias if alias in settings.CACHES else 'default']
+
+    def get_rate(self):
+        # Ставки читаются при каждом запросе, а не при импорте, как
+        # в SimpleRateThrottle, чтобы работал override_settings.
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'Не задана ставка для scope {self.scope!r}.'
+            )
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        with self.lock() as locked:
+            if not locked:
+                self.wait_time = 1
+                return False
+            now = self.timer()
+            refill = self.num_requests / self.duration
+            tokens, updated = self.cache.get(
+                self.key, (self.num_requests, now)
+            )
+            tokens = min(self.num_requests, tokens + (now - updated) * refill)
+            if tokens < 1:
+                self.wait_time = (1 - tokens) / refill
+                return False
+            self.cache.set(self.key, (tokens - 1, now), self.duration)
+            return True
+
+    @contextmanager
+    def lock(self):
+        """Блокировка корзины; False, если ее не удалось взять."""
+        lock_key = f'{self.key}:lock'
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock_key, 1, self.lock_timeout):
+            if time.monotonic() > deadline:
+                yield False
+                return
+            time.sleep(0.001)
+        try:
+            yield True
+        finally:
+            self.cache.delete(lock_key)
+
+    def wait(self):
+        return getattr(self, 'wait_time', None)
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина на IP-адрес клиента."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class UserThrottle(TokenBucketThrottle):
+    """Корзина на пользователя, для анонимов - на IP-адрес."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user_{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class SignupThrottle(IPThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(IPThrottle):
+    scope = 'token'
+
+
+class WriteThrottle(UserThrottle):
+    """Создание отзывов и комментариев."""
+    scope = 'writes'
+    methods = ('POST',)
@@ -2,29 +2,38 @@ from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets, filters
 from rest_framework.filters import SearchFilter
-from rest_framework.decorators import permission_classes
+from rest_framework.decorators import permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.decorators import action, api_view
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.pagination import LimitOffsetPagination
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import transaction
+from django.http import StreamingHttpResponse
 
 from api.serializers import (RegistrationSerializer,
                              TokenSerializer, UserSerializer,
                              UserEditSerializer, CategorySerializer,
                              GenreSerializer, TitleCreateSerializer,
                              TitleDisplaySerializer, CommentSerializer,
-                             ReviewSerializer
+                             ReviewSerializer, LeaderboardEntrySerializer
                              )
-from reviews.models import Category, Genre, Review, Title, Comment
+from reviews import export, leaderboards
+from reviews.models import (Category, Genre, Leaderboard, Review, Title,
+                            Comment)
 from users.models import User
+from emails.outbox import enqueue_email
+from api.authentication import YamdbAccessToken
+from api.cache import title_key
+from api.throttling import SignupThrottle, TokenThrottle, WriteThrottle
 
-from api.mixins import DestroyCreateListMixins
+from api.mixins import (CachedListMixin, CachedReadMixin, CompactRefsMixin,
+                        ConditionalGetMixin, DestroyCreateListMixins,
+                        EagerLoadingMixin, NestedParentMixin,
+                        SparseFieldsMixin)
 from api.filters import TitlesFilter
+from api.pagination import PubDatePagination, TitlePagination
 from .permissions import (IsAdminOrReadOnly, IsStaffOrAuthorOrReadOnly,
                           IsAdminOrSuperUser, IsAuthenticatedOrReadOnly
                           )
@@ -32,27 +41,25 @@ from .permissions import (IsAdminOrReadOnly, IsStaffOrAuthorOrReadOnly,
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([SignupThrottle])
 def registration(request):
     """Регистрация пользователя"""
     serializer = RegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = serializer.data['username']
-    email = serializer.data['email']
-    user, _ = User.objects.get_or_create(
-        username=username,
-        email=email)
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        subject='Регистрация на сайте YaMDb',
-        message=f'Ваш код подтверждения: {confirmation_code}',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email]
-    )
+    with transaction.atomic():
+        user = serializer.save()
+        confirmation_code = default_token_generator.make_token(user)
+        enqueue_email(
+            subject='Регистрация на сайте YaMDb',
+            message=f'Ваш код подтверждения: {confirmation_code}',
+            recipient_list=[user.email]
+        )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([TokenThrottle])
 def get_jwt_token(request):
     """Получение jwt токена"""
     serializer = TokenSerializer(data=request.data)
@@ -62,12 +69,12 @@ def get_jwt_token(request):
     if default_token_generator.check_token(
         user, serializer.validated_data['confirmation_code']
     ):
-        token = AccessToken.for_user(user)
+        token = YamdbAccessToken.for_user(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     """Администратор получает список пользователей или создает нового"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -84,10 +91,12 @@ class UserViewSet(viewsets.ModelViewSet):
         url_path='me',
         permission_classes=[permissions.IsAuthenticated],)
     def me_info(self, request):
-        user = request.user
+        # В request.user только поля из токена, профиль читаем из базы.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == "GET":
             serializer = UserSerializer(
-                user, data=request.data, partial=True)
+                user, data=request.data, partial=True,
+                context=self.get_serializer_context())
             serializer.is_valid(raise_exception=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         if request.method == "PATCH":
@@ -99,8 +108,10 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class CategoriesViewSet(DestroyCreateListMixins):
+class CategoriesViewSet(CachedListMixin, SparseFieldsMixin, EagerLoadingMixin,
+                        DestroyCreateListMixins):
     """Вьюсет категорий произведений."""
+    cache_models = (Category,)
     permission_classes = [
         IsAdminOrReadOnly
     ]
@@ -116,8 +127,10 @@ class CategoriesViewSet(DestroyCreateListMixins):
     lookup_field = 'slug'
 
 
-class GenresViewSet(DestroyCreateListMixins):
+class GenresViewSet(CachedListMixin, SparseFieldsMixin, EagerLoadingMixin,
+                    DestroyCreateListMixins):
     """Вьюсет жанра произведений."""
+    cache_models = (Genre,)
     permission_classes = [
         IsAdminOrReadOnly
     ]
@@ -134,8 +147,10 @@ class GenresViewSet(DestroyCreateListMixins):
     )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedReadMixin, SparseFieldsMixin,
+                   EagerLoadingMixin, viewsets.ModelViewSet):
     """Вьюсет произведений."""
+    cache_models = (Title, Category, Genre, Review)
     permission_classes = [
         IsAdminOrReadOnly
     ]
@@ -144,9 +159,8 @@ class TitleViewSet(viewsets.ModelViewSet):
         filters.SearchFilter,
     )
     filterset_class = TitlesFilter
-    queryset = Title.objects.annotate(
-        rating=Avg('review__score')).all()
-    pagination_class = LimitOffsetPagination
+    queryset = Title.objects.all()
+    pagination_class = TitlePagination
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -154,33 +168,175 @@ class TitleViewSet(viewsets.ModelViewSet):
         else:
             return TitleCreateSerializer
 
+    @action(detail=False)
+    def top(self, request):
+        """
+        Топ произведений из сохраненной таблицы.
+
+        ?by=rating|review_count, ?category=<slug> или ?genre=<slug>,
+        ?limit=<n> не больше LEADERBOARD_SIZE.
+        """
+        params = request.query_params
+        kind = params.get('by', Leaderboard.RATING)
+        errors = {}
+        if kind not in dict(Leaderboard.KINDS):
+            errors['by'] = ['Допустимые значения: rating, review_count.']
+        if 'category' in params and 'genre' in params:
+            errors['non_field_errors'] = [
+                'Укажите категорию или жанр, но не оба сразу.'
+            ]
+        limit = params.get('limit', str(settings.LEADERBOARD_SIZE))
+        if not limit.isdigit() or not (
+            0 < int(limit) <= settings.LEADERBOARD_SIZE
+        ):
+            errors['limit'] = [
+                f'Число от 1 до {settings.LEADERBOARD_SIZE}.'
+            ]
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        category = genre = None
+        if 'category' in params:
+            category = get_object_or_404(Category, slug=params['category'])
+        if 'genre' in params:
+            genre = get_object_or_404(Genre, slug=params['genre'])
+        board = leaderboards.get_leaderboard(kind, category, genre)
+        serializer = LeaderboardEntrySerializer(
+            leaderboards.get_entries(board, int(limit)), many=True
+        )
+        return Response(serializer.data)
+
+    @action(detail=False, permission_classes=(IsAdminOrSuperUser,))
+    def export(self, request):
+        """
+        Потоковая выгрузка произведений: ?type=ndjson (по умолчанию) или csv.
+
+        Поддерживает те же фильтры, что и список произведений.
+        """
+        export_type = request.query_params.get('type', 'ndjson')
+        if export_type not in export.FORMATS:
+            return Response(
+                {'type': [f'Допустимые значения: '
+                          f'{", ".join(export.FORMATS)}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, lines = export.FORMATS[export_type]
+        titles = export.iter_titles(self.filter_queryset(Title.objects.all()))
+        response = StreamingHttpResponse(
+            lines(titles), content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="titles.{export_type}"'
+        )
+        return response
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Создает пакет произведений.
 
-class CommentViewSet(viewsets.ModelViewSet):
+        ?mode=atomic (по умолчанию) создает все или ничего, ?mode=partial
+        создает корректные элементы. Ответ - результат по каждому элементу.
+        """
+        mode = request.query_params.get('mode', 'atomic')
+        if mode not in ('atomic', 'partial'):
+            return Response(
+                {'mode': ['Допустимые значения: atomic, partial.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = settings.TITLES_BULK_LIMIT
+        if isinstance(request.data, list) and len(request.data) > limit:
+            return Response(
+                {'non_field_errors': [f'Не больше {limit} элементов.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        items = serializer.validate_items()
+        failed = any(errors for _, errors in items)
+        results = [
+            {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+            if errors else None
+            for _, errors in items
+        ]
+        if failed and mode == 'atomic':
+            for index, result in enumerate(results):
+                results[index] = result or {
+                    'status': status.HTTP_424_FAILED_DEPENDENCY,
+                    'errors': {'non_field_errors': [
+                        'Пакет не создан из-за ошибок в других элементах.'
+                    ]},
+                }
+            return Response(results, status=status.HTTP_400_BAD_REQUEST)
+
+        valid = [data for data, errors in items if not errors]
+        with transaction.atomic():
+            titles = iter(serializer.create(valid) if valid else ())
+        for index, result in enumerate(results):
+            results[index] = result or {
+                'status': status.HTTP_201_CREATED,
+                'data': serializer.child.to_representation(next(titles)),
+            }
+        return Response(
+            results,
+            status=(status.HTTP_207_MULTI_STATUS if failed
+                    else status.HTTP_201_CREATED)
+        )
+
+
+class CommentViewSet(ConditionalGetMixin, SparseFieldsMixin, CompactRefsMixin,
+                     NestedParentMixin, EagerLoadingMixin,
+                     viewsets.ModelViewSet):
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    parent_fields = {'title': ('id', 'name'), 'review': ('id', 'text')}
     permission_classes = (IsStaffOrAuthorOrReadOnly,)
+    throttle_classes = (WriteThrottle,)
+    pagination_class = PubDatePagination
+
+    def get_version_keys(self):
+        # Отзывы и комментарии произведения версионируются вместе.
+        return [title_key(self.kwargs['title_id'])]
+
+    def resolve_parents(self):
+        review = get_object_or_404(
+            Review.objects.select_related('title'),
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
+        return {'title': review.title, 'review': review}
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        return self.get_parents()['review']
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'),
-                                   title=title)
-        return Comment.objects.filter(review=review)
+        return super().get_queryset().filter(review=self.get_review())
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin, CompactRefsMixin,
+                    NestedParentMixin, EagerLoadingMixin,
+                    viewsets.ModelViewSet):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    parent_fields = {'title': ('id', 'name')}
     permission_classes = (IsStaffOrAuthorOrReadOnly,)
+    throttle_classes = (WriteThrottle,)
+    pagination_class = PubDatePagination
+
+    def get_version_keys(self):
+        return [title_key(self.kwargs['title_id'])]
+
+    def resolve_parents(self):
+        return {
+            'title': get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        }
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get("title_id"))
+        return self.get_parents()['title']
 
     def get_queryset(self):
-        return Review.objects.filter(title=self.get_title())
+        return super().get_queryset().filter(title=self.get_title())
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
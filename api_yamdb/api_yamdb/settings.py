@@ -29,9 +29,11 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
     'reviews.apps.ReviewsConfig',
     'users',
+    'emails.apps.EmailsConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,6 +75,39 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Кэш ответов API. Версии данных для его ключей и для ETag хранятся
+# в базе (api.Version), поэтому кэш может быть своим у каждого воркера.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    },
+    # Корзины ограничения частоты отдельно от ответов: кэш ответов
+    # не вытесняет их. Корзины свои в каждом процессе; общие для всех
+    # воркеров дает DatabaseCache (manage.py createcachetable).
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb-throttle',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+THROTTLE_CACHE = 'throttle'
+
+API_CACHE_TIMEOUT = 60 * 15
+
+# Максимум произведений в одном запросе к /api/v1/titles/bulk/.
+TITLES_BULK_LIMIT = 1000
+
+# Сколько произведений хранится в каждом топе /api/v1/titles/top/.
+LEADERBOARD_SIZE = 100
+
+# Заголовки X-DB-Query-Count и X-DB-Query-Time в ответах.
+QUERY_COUNT_HEADER = DEBUG
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -116,11 +151,32 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
+    ],
+    # orjson, если установлен; MessagePack по Accept: application/msgpack.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
                                 'PageNumberPagination',
     "PAGE_SIZE": 10,
+    # Число доверенных прокси перед приложением. При 0 адрес клиента
+    # берется из REMOTE_ADDR, а X-Forwarded-For, который клиент может
+    # подделать, не учитывается.
+    'NUM_PROXIES': 0,
+    # Token bucket: емкость N и пополнение N за период, см. api.throttling.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '10/min',
+        'token': '20/min',
+        'writes': '30/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -130,6 +186,13 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# Размер LRU-кэша проверенных JWT в каждом процессе.
+JWT_TOKEN_CACHE_SIZE = 10000
+
+# Как часто, в секундах, процесс перечитывает отзывы токенов из базы:
+# столько отзыв может идти до других воркеров. 0 - на каждый запрос.
+JWT_REVOCATION_REFRESH = 5
+
 DEFAULT_FROM_EMAIL = 'support@yamdb.ru'
 
 AUTH_USER_MODEL = 'users.User'
@@ -138,6 +201,16 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Очередь писем: manage.py send_emails
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
+# На сколько секунд воркер забирает пакет писем в работу.
+EMAIL_OUTBOX_LEASE = 300
+
 LIMIT_USERNAME = 150
 
 LIMIT_CODE = 256
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from emails.models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'created', 'attempts', 'sent')
+    list_filter = ('sent',)
+    search_fields = ('to',)
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from emails.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пакетами с повторными попытками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--max-attempts', type=int)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между опросами пустой очереди, с.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending(
+                options['batch_size'], options['max_attempts']
+            )
+            if sent or failed:
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+                continue
+            # Готовых к отправке писем больше нет.
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
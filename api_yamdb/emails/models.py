@@ -0,0 +1,59 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+    subject = models.CharField(
+        max_length=255,
+        verbose_name='Тема',
+    )
+    body = models.TextField(
+        verbose_name='Текст',
+    )
+    from_email = models.CharField(
+        max_length=254,
+        verbose_name='Отправитель',
+    )
+    to = models.TextField(
+        verbose_name='Получатели',
+        help_text='Адреса через запятую.',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано',
+    )
+    next_attempt = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    sent = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено',
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('sent', 'next_attempt'), name='emails_pending_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to}'
+
+    @property
+    def recipients(self):
+        return [address for address in self.to.split(',') if address]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from emails.models import OutgoingEmail
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """
+    Ставит письмо в очередь.
+
+    Запись идет в текущую транзакцию, поэтому письмо уйдет, только если
+    вместе с ним сохранились и остальные данные запроса.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=','.join(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_pending(batch_size, max_attempts):
+    """
+    Забирает пакет писем в работу и сразу фиксирует транзакцию.
+
+    Письма получают аренду: next_attempt сдвигается на
+    EMAIL_OUTBOX_LEASE секунд, и ни другой воркер, ни повторный запуск
+    не возьмут их, пока идет отправка. Если воркер упадет, письма
+    вернутся в очередь после окончания аренды. Попытка засчитывается
+    при захвате.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    with transaction.atomic():
+        queryset = OutgoingEmail.objects.filter(
+            sent__isnull=True,
+            attempts__lt=max_attempts,
+            next_attempt__lte=now,
+        )
+        if db_connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return []
+        # Условие повторяется: параллельный воркер мог забрать часть
+        # писем между выборкой и обновлением.
+        OutgoingEmail.objects.filter(
+            pk__in=ids, sent__isnull=True, next_attempt__lte=now
+        ).update(next_attempt=lease_until, attempts=F('attempts') + 1)
+        return list(OutgoingEmail.objects.filter(
+            pk__in=ids, next_attempt=lease_until
+        ))
+
+
+def deliver(emails):
+    """
+    Отправляет письма через одно соединение, вне транзакции.
+
+    Возвращает словарь id -> текст ошибки для неотправленных писем.
+    Если соединение не открылось, ошибка записывается всем письмам.
+    """
+    errors = {}
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.recipients,
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    errors[email.pk] = repr(error)
+    except Exception as error:
+        for email in emails:
+            errors.setdefault(email.pk, repr(error))
+    return errors
+
+
+def send_pending(batch_size=None, max_attempts=None):
+    """
+    Отправляет пакет писем через одно соединение с почтовым сервером.
+
+    Во время отправки транзакция не открыта, поэтому медленный почтовый
+    сервер не блокирует запись в базу для запросов. Возвращает пару
+    (отправлено, с ошибкой).
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    emails = claim_pending(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+    errors = deliver(emails)
+    now = timezone.now()
+    for email in emails:
+        if email.pk in errors:
+            email.last_error = errors[email.pk]
+            email.next_attempt = now + retry_delay(email.attempts)
+        else:
+            email.sent = now
+    with transaction.atomic():
+        OutgoingEmail.objects.bulk_update(
+            emails, ('last_error', 'next_attempt', 'sent')
+        )
+    return len(emails) - len(errors), len(errors)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from reviews import signals
+
+        post_migrate.connect(signals.search_index_migrated, sender=self)
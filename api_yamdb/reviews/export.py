@@ -0,0 +1,71 @@
+import csv
+import json
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+
+from reviews.models import Title
+
+CHUNK_SIZE = 2000
+
+FIELDS = ('id', 'name', 'year', 'description', 'category', 'genre', 'rating')
+
+
+def iter_titles(queryset=None, chunk_size=CHUNK_SIZE):
+    """
+    Перебирает произведения пачками по chunk_size.
+
+    iterator() не держит в памяти всю выборку и игнорирует
+    prefetch_related, поэтому жанры загружаются отдельным запросом
+    на каждую пачку.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    titles = queryset.select_related('category').order_by('pk').iterator(
+        chunk_size=chunk_size
+    )
+    while True:
+        chunk = list(islice(titles, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, 'genre')
+        yield from chunk
+
+
+def title_row(title):
+    return {
+        'id': title.pk,
+        'name': title.name,
+        'year': title.year,
+        'description': title.description,
+        'category': title.category.slug if title.category else None,
+        'genre': sorted(genre.slug for genre in title.genre.all()),
+        'rating': title.rating,
+    }
+
+
+def ndjson_lines(titles):
+    for title in titles:
+        yield json.dumps(title_row(title), ensure_ascii=False) + '\n'
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(titles):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for title in titles:
+        row = title_row(title)
+        row['genre'] = ','.join(row['genre'])
+        yield writer.writerow([row[field] for field in FIELDS])
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+    'csv': ('text/csv', csv_lines),
+}
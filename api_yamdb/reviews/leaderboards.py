@@ -0,0 +1,236 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from reviews.models import Leaderboard, LeaderboardEntry, Title
+
+# Поле произведения, по которому строится топ каждого вида.
+KIND_FIELDS = {
+    Leaderboard.RATING: 'rating',
+    Leaderboard.REVIEW_COUNT: 'rating_count',
+}
+
+
+def get_leaderboard(kind, category=None, genre=None):
+    """
+    Возвращает топ, создавая и заполняя его при первом обращении.
+
+    Топ создается вместе с местами в одной транзакции, поэтому другие
+    запросы не увидят его пустым. Дальше он только обновляется.
+    """
+    try:
+        with transaction.atomic():
+            board, created = Leaderboard.objects.get_or_create(
+                kind=kind, category=category, genre=genre
+            )
+            if created:
+                refresh(board)
+    except IntegrityError:
+        # Топ одновременно создал параллельный запрос.
+        board = Leaderboard.objects.get(
+            kind=kind, category=category, genre=genre
+        )
+    return board
+
+
+def get_candidates(board):
+    """Произведения, которые могут стоять в топе, по убыванию значения."""
+    field = KIND_FIELDS[board.kind]
+    titles = Title.objects.filter(**{f'{field}__gt': 0})
+    if board.category_id:
+        titles = titles.filter(category_id=board.category_id)
+    if board.genre_id:
+        titles = titles.filter(genre=board.genre_id)
+    return titles.order_by(f'-{field}', '-pk').values_list('pk', field)
+
+
+def refresh(board):
+    """
+    Полностью пересчитывает один топ запросом ORDER BY ... LIMIT.
+
+    Нужен только при создании топа и после массовых изменений рейтинга
+    (rebuild_ratings), запросы на чтение его не вызывают.
+    """
+    top = get_candidates(board)[:settings.LEADERBOARD_SIZE]
+    with transaction.atomic():
+        # Параллельные изменения одного топа выполняются по очереди.
+        Leaderboard.objects.select_for_update().filter(pk=board.pk).first()
+        board.entries.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            LeaderboardEntry(leaderboard=board, title_id=pk, value=value)
+            for pk, value in top
+        )
+        board.refreshed = timezone.now()
+        Leaderboard.objects.filter(pk=board.pk).update(
+            refreshed=board.refreshed
+        )
+
+
+def refresh_all(boards=None):
+    if boards is None:
+        boards = Leaderboard.objects.all()
+    for board in boards:
+        refresh(board)
+
+
+def next_candidate(board, exclude, last):
+    """Лучшее произведение вне топа: строго ниже последнего места."""
+    field = KIND_FIELDS[board.kind]
+    titles = get_candidates(board).exclude(pk=exclude)
+    if last is not None:
+        titles = titles.filter(
+            Q(**{f'{field}__lt': last.value})
+            | Q(**{field: last.value, 'pk__lt': last.title_id})
+        )
+    return titles.first()
+
+
+def rank(entry):
+    return entry.value, entry.title_id
+
+
+def fill_vacancy(board, pk, candidate, last):
+    """
+    Место, освобожденное произведением ``pk`` в полном топе.
+
+    Оно опустилось ниже последнего места, и его может обойти следующее
+    за последним произведение вне топа.
+    """
+    replacement = next_candidate(board, pk, last)
+    if replacement is None or (
+        candidate is not None and replacement[::-1] < rank(candidate)
+    ):
+        return candidate
+    return LeaderboardEntry(
+        leaderboard=board, title_id=replacement[0], value=replacement[1]
+    )
+
+
+def board_value(board, title, genres):
+    """Значение произведения в топе или None, если оно туда не входит."""
+    if title is None or board.category_id not in (
+        None, title['category_id']
+    ) or board.genre_id not in (None, *genres):
+        return None
+    return title[KIND_FIELDS[board.kind]] or None
+
+
+def update_board(board, entries, pk, title, genres):
+    """
+    Переставляет в топе одно произведение по его текущему значению.
+
+    ``entries`` - места топа по убыванию, список меняется на месте;
+    ``title`` - значения произведения ``pk`` или None, если его нет.
+    Топ хранит ровно LEADERBOARD_SIZE лучших, поэтому все, что выше
+    последнего места, уже в нем: новое произведение сравнивается только
+    с последним местом, а вне топа ищется лишь замена выбывшему.
+    Возвращает (удаленные места, новое место или None).
+    """
+    size = settings.LEADERBOARD_SIZE
+    value = board_value(board, title, genres)
+    current = next(
+        (entry for entry in entries if entry.title_id == pk), None
+    )
+    if current is not None and current.value == value:
+        return [], None
+    removed = []
+    if current is not None:
+        entries.remove(current)
+        removed.append(current)
+    last = entries[-1] if entries else None
+    candidate = None
+    if value is not None:
+        candidate = LeaderboardEntry(
+            leaderboard=board, title_id=pk, value=value
+        )
+    if current is None:
+        # Вне топа лучше последнего места ничего нет.
+        if candidate is None or (
+            len(entries) >= size and rank(candidate) < rank(last)
+        ):
+            return removed, None
+    elif len(entries) == size - 1 and (
+        candidate is None or rank(candidate) < rank(last)
+    ):
+        candidate = fill_vacancy(board, pk, candidate, last)
+    if candidate is None:
+        return removed, None
+    entries.append(candidate)
+    entries.sort(key=rank, reverse=True)
+    if len(entries) > size:
+        removed.append(entries.pop())
+    if candidate not in entries:
+        return removed, None
+    return removed, candidate
+
+
+@transaction.atomic
+def update_titles(title_ids):
+    """
+    Обновляет топы после изменения рейтинга, категории или жанров.
+
+    Затронутые топы - общие, топы категорий и жанров произведений и
+    топы, где они уже стоят. Их места читаются одним запросом, в базу
+    пишутся только строки переставленных произведений.
+    """
+    if not Leaderboard.objects.exists():
+        # Топы еще никто не запрашивал, обновлять нечего.
+        return
+    title_ids = set(title_ids)
+    titles = {
+        title['pk']: title
+        for title in Title.objects.filter(pk__in=title_ids).values(
+            'pk', 'category_id', *KIND_FIELDS.values()
+        )
+    }
+    genres = {pk: set() for pk in title_ids}
+    for title_id, genre_id in Title.genre.through.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].add(genre_id)
+    boards = list(Leaderboard.objects.select_for_update().filter(
+        Q(category=None, genre=None)
+        | Q(category__in={
+            title['category_id'] for title in titles.values()
+        })
+        | Q(genre__in=set().union(*genres.values()))
+        | Q(pk__in=LeaderboardEntry.objects.filter(
+            title_id__in=title_ids
+        ).values('leaderboard_id'))
+    ))
+    entries = {board.pk: [] for board in boards}
+    for entry in LeaderboardEntry.objects.filter(
+        leaderboard__in=boards
+    ).order_by('-value', '-title_id'):
+        entries[entry.leaderboard_id].append(entry)
+    removed = []
+    created = []
+    for board in boards:
+        for pk in title_ids:
+            old, new = update_board(
+                board, entries[board.pk], pk, titles.get(pk), genres[pk]
+            )
+            for entry in old:
+                if entry.pk is None:
+                    created.remove(entry)
+                else:
+                    removed.append(entry.pk)
+            if new is not None:
+                created.append(new)
+    if removed:
+        LeaderboardEntry.objects.filter(pk__in=removed).delete()
+    LeaderboardEntry.objects.bulk_create(created)
+
+
+def get_entries(board, limit=None):
+    """Места топа с произведениями; номер места - в ``position``."""
+    entries = board.entries.select_related(
+        'title__category'
+    ).prefetch_related('title__genre')
+    if limit is not None:
+        entries = entries[:limit]
+    entries = list(entries)
+    for position, entry in enumerate(entries, 1):
+        entry.position = position
+    return entries
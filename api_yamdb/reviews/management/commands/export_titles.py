@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import CHUNK_SIZE, FORMATS, iter_titles
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает произведения с жанрами, категорией и рейтингом '
+        'в формате NDJSON или CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=FORMATS, default='ndjson')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        _, lines = FORMATS[options['type']]
+        lines = lines(iter_titles(chunk_size=options['chunk_size']))
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as file:
+            file.writelines(lines)
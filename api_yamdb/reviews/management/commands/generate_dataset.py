@@ -0,0 +1,259 @@
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from api.cache import bump_epoch
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
+from reviews.utils import keep_auto_now_add, reset_sequences
+from users.models import User
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Показатель степени для распределения Ципфа: чем больше, тем сильнее
+# популярные произведения и активные пользователи забирают отзывы.
+TITLE_SKEW = 1.1
+USER_SKEW = 0.9
+
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_RANGE = timedelta(days=365 * 8)
+
+CATEGORIES = (
+    ('Фильм', 'movie'),
+    ('Книга', 'book'),
+    ('Музыка', 'music'),
+)
+
+GENRES = (
+    ('Драма', 'drama'),
+    ('Комедия', 'comedy'),
+    ('Фантастика', 'sci-fi'),
+    ('Ужасы', 'horror'),
+    ('Детектив', 'detective'),
+    ('Триллер', 'thriller'),
+    ('Рок', 'rock'),
+    ('Классика', 'classical'),
+)
+
+WORDS = (
+    'тень', 'город', 'ветер', 'ночь', 'море', 'звезда', 'дорога', 'огонь',
+    'сад', 'зима', 'песня', 'остров', 'мост', 'река', 'свет', 'время',
+)
+
+
+def zipf_cum_weights(size, skew):
+    """Накопленные веса Ципфа для rng.choices и bisect."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, size + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический набор данных со смещенными '
+        'распределениями отзывов и комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews-per-title', type=int, default=10)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        for name in ('titles', 'users', 'batch_size'):
+            if options[name] <= 0:
+                raise CommandError(f'--{name.replace("_", "-")} должен '
+                                   'быть больше нуля.')
+        for name in ('reviews_per_title', 'comments_per_review'):
+            if options[name] < 0:
+                raise CommandError(f'--{name.replace("_", "-")} не может '
+                                   'быть отрицательным.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.pending = {Review: [], Comment: []}
+        self.created = dict.fromkeys((User, Title, Review, Comment), 0)
+        started = time.monotonic()
+
+        with transaction.atomic(), keep_auto_now_add(Review), \
+                keep_auto_now_add(Comment):
+            categories, genres = self.create_dictionaries()
+            user_ids = self.create_users(options['users'])
+            titles = self.create_titles(options['titles'], categories, genres)
+            self.create_reviews(
+                titles, user_ids,
+                options['reviews_per_title'], options['comments_per_review']
+            )
+            reset_sequences(User, Title, Review, Comment)
+            rebuild_ratings()
+            # bulk_create не отправляет сигналы: сбрасываем кэш ответов.
+            bump_epoch()
+
+        elapsed = time.monotonic() - started
+        for model, count in self.created.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Готово за {elapsed:.1f} с'))
+
+    def next_id(self, model):
+        return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+    def random_date(self, after=START_DATE):
+        left = START_DATE + DATE_RANGE - after
+        return after + left * self.rng.random()
+
+    def create_dictionaries(self):
+        categories = [
+            Category.objects.get_or_create(
+                slug=slug, defaults={'name': name}
+            )[0]
+            for name, slug in CATEGORIES
+        ]
+        genres = [
+            Genre.objects.get_or_create(
+                slug=slug, defaults={'name': name}
+            )[0]
+            for name, slug in GENRES
+        ]
+        return categories, genres
+
+    def create_users(self, count):
+        first_id = self.next_id(User)
+        users = [
+            User(
+                id=first_id + index,
+                username=f'gen_user_{first_id + index}',
+                email=f'gen_user_{first_id + index}@yamdb.fake',
+                password=UNUSABLE_PASSWORD_PREFIX,
+            )
+            for index in range(count)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.created[User] += count
+        # Случайный порядок, чтобы «активные» пользователи не совпадали
+        # с первыми id.
+        user_ids = [user.id for user in users]
+        self.rng.shuffle(user_ids)
+        return user_ids
+
+    def create_titles(self, count, categories, genres):
+        first_id = self.next_id(Title)
+        titles = []
+        links = []
+        for index in range(count):
+            title = Title(
+                id=first_id + index,
+                name=' '.join(self.rng.sample(WORDS, 2)).capitalize(),
+                year=self.rng.randint(1950, 2022),
+                description=' '.join(self.rng.choices(WORDS, k=20)),
+                category=self.rng.choice(categories),
+            )
+            titles.append(title)
+            for genre in self.rng.sample(genres, self.rng.randint(1, 3)):
+                links.append(Title.genre.through(
+                    title_id=title.id, genre_id=genre.id
+                ))
+        Title.objects.bulk_create(titles, batch_size=self.batch_size)
+        Title.genre.through.objects.bulk_create(
+            links, batch_size=self.batch_size
+        )
+        self.created[Title] += count
+        self.rng.shuffle(titles)
+        return titles
+
+    def pick_authors(self, user_ids, cum_weights, count):
+        """Выбирает count разных авторов с перекосом к активным."""
+        if count * 2 >= len(user_ids):
+            return self.rng.sample(user_ids, count)
+        picked = set()
+        while len(picked) < count:
+            picked.update(self.rng.choices(
+                user_ids, cum_weights=cum_weights, k=count - len(picked)
+            ))
+        return list(picked)
+
+    def review_counts(self, titles_count, users_count, per_title):
+        """
+        Делит titles_count * per_title отзывов по Ципфу.
+
+        У произведения не больше users_count отзывов (один на автора),
+        излишек популярных произведений переходит к следующим.
+        """
+        cum_weights = zipf_cum_weights(titles_count, TITLE_SKEW)
+        total = titles_count * per_title
+        counts = []
+        previous = 0
+        for weight in cum_weights:
+            share = (weight - previous) / cum_weights[-1]
+            previous = weight
+            counts.append(min(users_count, round(total * share)))
+        leftover = min(total, titles_count * users_count) - sum(counts)
+        for index in itertools.cycle(range(titles_count)):
+            if leftover <= 0:
+                break
+            if counts[index] < users_count:
+                counts[index] += 1
+                leftover -= 1
+        return counts
+
+    def create_reviews(self, titles, user_ids, per_title, per_review):
+        user_weights = zipf_cum_weights(len(user_ids), USER_SKEW)
+        review_id = itertools.count(self.next_id(Review))
+        comment_id = itertools.count(self.next_id(Comment))
+        counts = self.review_counts(len(titles), len(user_ids), per_title)
+
+        for title, count in zip(titles, counts):
+            quality = self.rng.uniform(3, 9)
+            for author_id in self.pick_authors(user_ids, user_weights, count):
+                score = round(self.rng.gauss(quality, 1.5))
+                review = Review(
+                    id=next(review_id),
+                    title_id=title.id,
+                    author_id=author_id,
+                    text=' '.join(self.rng.choices(WORDS, k=30)),
+                    score=min(10, max(1, score)),
+                    pub_date=self.random_date(),
+                )
+                self.add(review)
+                if per_review <= 0:
+                    continue
+                comments = round(self.rng.expovariate(1 / per_review))
+                for _ in range(comments):
+                    index = bisect.bisect(
+                        user_weights, self.rng.random() * user_weights[-1]
+                    )
+                    self.add(Comment(
+                        id=next(comment_id),
+                        review_id=review.id,
+                        author_id=user_ids[min(index, len(user_ids) - 1)],
+                        text=' '.join(self.rng.choices(WORDS, k=10)),
+                        pub_date=self.random_date(review.pub_date),
+                    ))
+        self.flush(Review)
+        self.flush(Comment)
+
+    def add(self, obj):
+        model = type(obj)
+        self.pending[model].append(obj)
+        if len(self.pending[model]) >= self.batch_size:
+            if model is Comment:
+                # Комментарии ссылаются на еще не записанные отзывы.
+                self.flush(Review)
+            self.flush(model)
+
+    def flush(self, model):
+        batch = self.pending[model]
+        if batch:
+            model.objects.bulk_create(batch)
+            self.created[model] += len(batch)
+            self.pending[model] = []
@@ -0,0 +1,236 @@
+import csv
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from api.cache import bump_epoch
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
+from reviews.utils import (bulk_create_with_ids, keep_auto_now_add,
+                           reset_sequences)
+from users.models import User
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из static/data/*.csv пакетами bulk_create '
+        'и пересчитывает рейтинги произведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(settings.BASE_DIR / 'static' / 'data'),
+            help='Каталог с csv-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном bulk_create.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.path = options['path']
+        self.batch_size = options['batch_size']
+        # Соответствие id из файлов первичным ключам в базе.
+        self.users = {}
+        self.categories = {}
+        self.genres = {}
+        self.titles = {}
+        self.reviews = {}
+
+        self.load('users.csv', User, self.build_user, self.users)
+        self.load(
+            'category.csv', Category, self.build_category, self.categories
+        )
+        self.load('genre.csv', Genre, self.build_genre, self.genres)
+        self.load('titles.csv', Title, self.build_title, self.titles)
+        self.load(
+            'genre_title.csv', Title.genre.through, self.build_genre_title
+        )
+        with keep_auto_now_add(Review):
+            self.load('review.csv', Review, self.build_review, self.reviews)
+        with keep_auto_now_add(Comment):
+            self.load('comments.csv', Comment, self.build_comment)
+        reset_sequences(User, Category, Genre, Title, Review, Comment)
+
+        started = time.monotonic()
+        updated = rebuild_ratings()
+        # bulk_create не отправляет сигналы, кэш ответов сбрасывается здесь.
+        bump_epoch()
+        self.stdout.write(
+            f'ratings: {updated} произведений за '
+            f'{time.monotonic() - started:.2f} с'
+        )
+
+    def load(self, filename, model, build, id_map=None):
+        """
+        Потоково читает файл и вставляет строки пакетами.
+
+        Строка, чей естественный ключ уже есть в базе, не вставляется, а
+        ее id из файла указывает на найденную строку. Новая строка
+        сохраняет id из файла, если он свободен; иначе id назначает база
+        после вставки остальных строк, и id из файла ведет на него.
+        """
+        self.existing = self.get_existing(model)
+        self.taken = set(model.objects.values_list('pk', flat=True))
+        # (id из файла, объект): ключ известен только после вставки.
+        self.pending = []
+        self.relocated = []
+        self.skipped = 0
+        inserted = 0
+        started = time.monotonic()
+        with open(f'{self.path}/{filename}', encoding='utf-8') as file:
+            batch = []
+            with transaction.atomic():
+                for row in csv.DictReader(file):
+                    obj = self.add_row(model, row, build(row), id_map)
+                    if obj is None:
+                        continue
+                    batch.append(obj)
+                    if len(batch) >= self.batch_size:
+                        model.objects.bulk_create(batch)
+                        inserted += len(batch)
+                        batch = []
+                if batch:
+                    model.objects.bulk_create(batch)
+                    inserted += len(batch)
+                inserted += self.insert_relocated(model)
+        if id_map is not None:
+            for file_id, obj in self.pending:
+                id_map[file_id] = obj.pk
+        elapsed = time.monotonic() - started
+        rate = inserted / elapsed if elapsed else inserted
+        self.stdout.write(
+            f'{filename}: добавлено {inserted} '
+            f'(с новым id {len(self.relocated)}), пропущено {self.skipped}, '
+            f'{rate:.0f} строк/с'
+        )
+
+    def add_row(self, model, row, obj, id_map):
+        """Объект для вставки с id из файла или None."""
+        if obj is None:
+            self.skipped += 1
+            return None
+        natural_key = self.get_natural_key(model, obj)
+        if natural_key in self.existing:
+            found = self.existing[natural_key]
+            if isinstance(found, model):
+                self.pending.append((row.get('id'), found))
+            elif id_map is not None:
+                id_map[row['id']] = found
+            self.skipped += 1
+            return None
+        self.existing[natural_key] = obj
+        self.pending.append((row.get('id'), obj))
+        if obj.pk is not None and obj.pk in self.taken:
+            # id из файла занят другой строкой базы.
+            obj.pk = None
+            self.relocated.append(obj)
+            return None
+        self.taken.add(obj.pk)
+        return obj
+
+    def insert_relocated(self, model):
+        """Вставляет строки с занятыми id; новые id идут после всех."""
+        if not self.relocated:
+            return 0
+        reset_sequences(model)
+        for start in range(0, len(self.relocated), self.batch_size):
+            bulk_create_with_ids(
+                model, self.relocated[start:start + self.batch_size]
+            )
+        return len(self.relocated)
+
+    # Поля, по которым строка файла совпадает со строкой базы.
+    NATURAL_KEYS = {
+        User: ('username',),
+        Category: ('slug',),
+        Genre: ('slug',),
+        Title: ('name', 'year', 'category_id'),
+        Title.genre.through: ('title_id', 'genre_id'),
+        Review: ('title_id', 'author_id'),
+        Comment: ('review_id', 'author_id', 'text', 'pub_date'),
+    }
+
+    def get_natural_key(self, model, obj):
+        return tuple(getattr(obj, name) for name in self.NATURAL_KEYS[model])
+
+    def get_existing(self, model):
+        """Естественные ключи уже существующих строк и их id."""
+        return {
+            values[:-1]: values[-1]
+            for values in model.objects.values_list(
+                *self.NATURAL_KEYS[model], 'pk'
+            )
+        }
+
+    def build_user(self, row):
+        return User(
+            id=int(row['id']),
+            username=row['username'],
+            email=row['email'],
+            role=row['role'] or User.USER,
+            bio=row['bio'],
+            first_name=row['first_name'],
+            last_name=row['last_name'],
+            password=make_password(None),
+        )
+
+    def build_category(self, row):
+        return Category(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_genre(self, row):
+        return Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_title(self, row):
+        return Title(
+            id=int(row['id']),
+            name=row['name'],
+            year=int(row['year']),
+            description=row.get('description') or None,
+            category_id=self.categories.get(row['category']),
+        )
+
+    def build_genre_title(self, row):
+        title_id = self.titles.get(row['title_id'])
+        genre_id = self.genres.get(row['genre_id'])
+        if title_id is None or genre_id is None:
+            return None
+        return Title.genre.through(title_id=title_id, genre_id=genre_id)
+
+    def build_review(self, row):
+        title_id = self.titles.get(row['title_id'])
+        author_id = self.users.get(row['author'])
+        if title_id is None or author_id is None:
+            return None
+        return Review(
+            id=int(row['id']),
+            title_id=title_id,
+            author_id=author_id,
+            text=row['text'],
+            score=int(row['score']),
+            pub_date=parse_datetime(row['pub_date']),
+        )
+
+    def build_comment(self, row):
+        review_id = self.reviews.get(row['review_id'])
+        author_id = self.users.get(row['author'])
+        if review_id is None or author_id is None:
+            return None
+        return Comment(
+            id=int(row['id']),
+            review_id=review_id,
+            author_id=author_id,
+            text=row['text'],
+            pub_date=parse_datetime(row['pub_date']),
+        )
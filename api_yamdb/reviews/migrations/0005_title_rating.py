@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-18 19:11
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.annotate(
+        score_sum=Sum('review__score'),
+        score_count=Count('review'),
+        score_avg=Avg('review__score'),
+    ).filter(score_count__gt=0)
+    for title in titles:
+        title.rating_sum = title.score_sum
+        title.rating_count = title.score_count
+        title.rating = int(title.score_avg)
+        title.save(update_fields=('rating_sum', 'rating_count', 'rating'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_delete_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Рейтинг произведения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
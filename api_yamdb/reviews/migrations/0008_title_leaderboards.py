@@ -0,0 +1,96 @@
+# Generated by Django 3.2 on 2026-10-18 19:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('rating', 'По рейтингу'), ('review_count', 'По числу отзывов')], max_length=16, verbose_name='Вид топа')),
+                ('stale', models.BooleanField(default=True, verbose_name='Устарел')),
+                ('refreshed', models.DateTimeField(blank=True, null=True, verbose_name='Пересчитан')),
+            ],
+            options={
+                'verbose_name': 'Топ произведений',
+                'verbose_name_plural': 'Топы произведений',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Место')),
+                ('value', models.PositiveIntegerField(verbose_name='Значение')),
+            ],
+            options={
+                'verbose_name': 'Место в топе',
+                'verbose_name_plural': 'Места в топе',
+                'ordering': ('position',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_count', 'id'], name='title_rating_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'rating'], name='title_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'rating_count'], name='title_category_count_idx'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='leaderboard',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='reviews.leaderboard'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddField(
+            model_name='leaderboard',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboards', to='reviews.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='leaderboard',
+            name='genre',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboards', to='reviews.genre', verbose_name='Жанр'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboardentry',
+            unique_together={('leaderboard', 'position')},
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.CheckConstraint(check=models.Q(('category', None), ('genre', None), _connector='OR'), name='leaderboard_single_scope'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(condition=models.Q(('category', None), ('genre', None)), fields=('kind',), name='leaderboard_global_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('kind', 'category'), name='leaderboard_category_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('kind', 'genre'), name='leaderboard_genre_unique'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_versions'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='leaderboardentry',
+            options={'ordering': ('-value', '-title_id'), 'verbose_name': 'Место в топе', 'verbose_name_plural': 'Места в топе'},
+        ),
+        migrations.RemoveField(
+            model_name='leaderboard',
+            name='stale',
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboardentry',
+            unique_together={('leaderboard', 'title')},
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['leaderboard', '-value', '-title_id'], name='leaderboard_entry_rank_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='position',
+        ),
+    ]
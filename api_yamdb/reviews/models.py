@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from reviews.validate import year_validator
 from django.core.validators import MaxValueValidator, MinValueValidator
 from users.models import User
@@ -77,10 +78,39 @@ class Title(models.Model):
         verbose_name='Категория произведения'
     )
 
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок',
+    )
+
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок',
+    )
+
+    rating = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Рейтинг произведения',
+    )
+
     class Meta:
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(
+                fields=('rating_count', 'id'), name='title_rating_count_idx'
+            ),
+            models.Index(
+                fields=('category', 'rating'), name='title_category_rating_idx'
+            ),
+            models.Index(
+                fields=('category', 'rating_count'),
+                name='title_category_count_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -109,6 +139,23 @@ class Review(models.Model):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         unique_together = ('author', 'title')
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date'), name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='review_author_pub_date_idx'
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем оценку из базы, чтобы при сохранении
+        # пересчитать рейтинг произведения по разнице.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
 
     def __str__(self):
         return self.text
@@ -137,6 +184,127 @@ class Comment(models.Model):
         ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class Leaderboard(models.Model):
+    """
+    Сохраненный топ произведений по рейтингу или числу отзывов.
+
+    Топ общий либо по одной категории или жанру. Строится один раз при
+    создании, дальше изменения рейтинга правят в нем только строку
+    затронутого произведения, чтение топ не пересчитывает.
+    """
+    RATING = 'rating'
+    REVIEW_COUNT = 'review_count'
+    KINDS = (
+        (RATING, 'По рейтингу'),
+        (REVIEW_COUNT, 'По числу отзывов'),
+    )
+
+    kind = models.CharField(
+        max_length=16, choices=KINDS, verbose_name='Вид топа'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboards',
+        verbose_name='Категория',
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboards',
+        verbose_name='Жанр',
+    )
+    refreshed = models.DateTimeField(
+        null=True, blank=True, verbose_name='Пересчитан'
+    )
+
+    class Meta:
+        verbose_name = 'Топ произведений'
+        verbose_name_plural = 'Топы произведений'
+        constraints = (
+            models.CheckConstraint(
+                check=Q(category=None) | Q(genre=None),
+                name='leaderboard_single_scope',
+            ),
+            models.UniqueConstraint(
+                fields=('kind',),
+                condition=Q(category=None, genre=None),
+                name='leaderboard_global_unique',
+            ),
+            models.UniqueConstraint(
+                fields=('kind', 'category'),
+                name='leaderboard_category_unique',
+            ),
+            models.UniqueConstraint(
+                fields=('kind', 'genre'),
+                name='leaderboard_genre_unique',
+            ),
+        )
+
+    def __str__(self):
+        scope = self.category or self.genre or 'все'
+        return f'{self.get_kind_display()}: {scope}'
+
+
+class LeaderboardEntry(models.Model):
+    leaderboard = models.ForeignKey(
+        Leaderboard,
+        on_delete=models.CASCADE,
+        related_name='entries',
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Произведение',
+    )
+    value = models.PositiveIntegerField(verbose_name='Значение')
+
+    class Meta:
+        ordering = ('-value', '-title_id')
+        verbose_name = 'Место в топе'
+        verbose_name_plural = 'Места в топе'
+        unique_together = ('leaderboard', 'title')
+        indexes = (
+            models.Index(
+                fields=('leaderboard', '-value', '-title_id'),
+                name='leaderboard_entry_rank_idx'
+            ),
+        )
+
+
+class Version(models.Model):
+    """
+    Счетчик изменений для ключей кэша ответов и ETag.
+
+    Хранится в базе, а не в кэше процесса: запись, обработанная одним
+    воркером, сразу меняет версию для всех остальных.
+    """
+    key = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name='Ключ',
+    )
+    value = models.BigIntegerField(verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.key}={self.value}'
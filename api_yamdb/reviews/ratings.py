@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, IntegerField, Sum, When
+from django.db.models.functions import Cast, Coalesce
+
+from reviews.leaderboards import refresh_all
+from reviews.models import Title
+
+BATCH_SIZE = 500
+
+RATING_FIELDS = ('rating_sum', 'rating_count', 'rating')
+
+
+def change_rating(title_id, score_delta, count_delta):
+    """Атомарно сдвигает сумму и количество оценок произведения."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    # В UPDATE все выражения считаются по старым значениям строки,
+    # поэтому рейтинг вычисляется из new_sum / new_count, а условие
+    # «оценок не осталось» проверяется по старому количеству.
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count=-count_delta, then=None),
+            default=Cast(new_sum / new_count, IntegerField()),
+        ),
+    )
+
+
+@transaction.atomic
+def rebuild_ratings(queryset=None):
+    """Пересчитывает сохраненные рейтинги по таблице отзывов и топы."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    titles = queryset.annotate(
+        score_sum=Coalesce(Sum('review__score'), 0),
+        score_count=Count('review'),
+        score_avg=Avg('review__score'),
+    ).only('pk')
+    updated = 0
+    batch = []
+    for title in titles.iterator(chunk_size=BATCH_SIZE):
+        title.rating_sum = title.score_sum
+        title.rating_count = title.score_count
+        title.rating = (
+            int(title.score_avg) if title.score_avg is not None else None
+        )
+        batch.append(title)
+        if len(batch) >= BATCH_SIZE:
+            Title.objects.bulk_update(batch, RATING_FIELDS)
+            updated += len(batch)
+            batch = []
+    if batch:
+        Title.objects.bulk_update(batch, RATING_FIELDS)
+        updated += len(batch)
+    refresh_all()
+    return updated
@@ -0,0 +1,98 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+from reviews.models import Title
+
+FTS_TABLE = 'reviews_title_fts'
+
+TERM_RE = re.compile(r'\w+')
+
+CREATE_INDEX_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+)
+
+CREATE_TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+)
+
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def install_search_index(connection, rebuild=False):
+    """
+    Создает FTS5-индекс произведений и триггеры синхронизации.
+
+    SQLite пересоздает таблицу при части миграций и теряет ее триггеры,
+    поэтому функция идемпотентна и вызывается также после migrate.
+    """
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for sql in CREATE_INDEX_SQL + CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(REBUILD_SQL)
+
+
+def drop_search_index(connection):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+def search_titles(queryset, query):
+    """Полнотекстовый поиск по названию и описанию с ранжированием."""
+    terms = TERM_RE.findall(query)
+    if not terms:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset.filter(condition)
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = {Title._meta.db_table}.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        select={'search_rank': f'{FTS_TABLE}.rank'},
+        order_by=['search_rank'],
+    )
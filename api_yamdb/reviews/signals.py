@@ -0,0 +1,94 @@
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from reviews.leaderboards import refresh_all, update_titles
+from reviews.models import Leaderboard, Review, Title
+from reviews.ratings import change_rating
+from reviews.search import FTS_TABLE, install_search_index
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Обновляет рейтинг произведения при создании и изменении отзыва."""
+    if raw:
+        return
+    # Рейтинг и топы меняются в одной транзакции: UPDATE рейтинга идет
+    # первым и сразу берет блокировку на запись.
+    with transaction.atomic():
+        if created:
+            change_rating(instance.title_id, instance.score, 1)
+            update_titles([instance.title_id])
+        else:
+            old_score = getattr(instance, '_loaded_score', None)
+            if old_score is not None and old_score != instance.score:
+                change_rating(
+                    instance.title_id, instance.score - old_score, 0
+                )
+                update_titles([instance.title_id])
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Вычитает оценку удаленного отзыва из рейтинга произведения."""
+    with transaction.atomic():
+        change_rating(instance.title_id, -instance.score, -1)
+        update_titles([instance.title_id])
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    """У измененного произведения могла смениться категория."""
+    if not created and not raw:
+        update_titles([instance.pk])
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    """Запоминает топы, где стоит произведение, до удаления его мест."""
+    instance._leaderboard_ids = list(
+        Leaderboard.objects.filter(entries__title=instance).values_list(
+            'pk', flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    """
+    Пересчитывает топы, где стояло удаленное произведение.
+
+    Его отзывы удаляются раньше и по одному переставляют его в топах,
+    поэтому эти топы собираются заново уже без него.
+    """
+    refresh_all(Leaderboard.objects.filter(
+        Q(pk__in=getattr(instance, '_leaderboard_ids', []))
+        | Q(entries__title_id=instance.pk)
+    ).distinct())
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Произведение попадает в топы других жанров."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        update_titles([instance.pk])
+    elif pk_set:
+        update_titles(pk_set)
+    else:
+        # genre.titles.clear(): какие произведения ушли, неизвестно.
+        refresh_all(instance.leaderboards.all())
+
+
+def search_index_migrated(sender, using, plan=None, **kwargs):
+    """Восстанавливает триггеры поискового индекса после миграций."""
+    connection = connections[using]
+    if plan is not None and not plan:
+        return
+    if FTS_TABLE in connection.introspection.table_names():
+        install_search_index(connection)
@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Не дает bulk_create затереть заданный pub_date текущим временем."""
+    fields = [
+        field for field in model._meta.local_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(*models):
+    """Сдвигает счетчики id после вставки строк с явными ключами."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def bulk_create_with_ids(model, objs):
+    """
+    bulk_create, после которого у новых объектов заполнен id.
+
+    SQLite в Django 3.2 не возвращает ключи из bulk_create. Строки одного
+    INSERT получают последовательные rowid, поэтому id пачки вычисляются
+    по last_insert_rowid(); размер пачки - ровно один INSERT.
+    """
+    objs = list(objs)
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+    if connection.vendor != 'sqlite':
+        for obj in objs:
+            obj.save(force_insert=True)
+        return objs
+    batch_size = connection.ops.bulk_batch_size(
+        model._meta.concrete_fields, objs
+    )
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            model.objects.bulk_create(batch)
+            cursor.execute('SELECT last_insert_rowid()')
+            last_id = cursor.fetchone()[0]
+            for pk, obj in enumerate(batch, last_id - len(batch) + 1):
+                obj.pk = pk
+    return objs
+
+
+def set_m2m(instance, field_name, objects, created=False):
+    """
+    Записывает связи many-to-many разницей с текущим набором.
+
+    Удаленные связи уходят одним DELETE, новые - одним INSERT. Для только
+    что созданного объекта (created=True) текущий набор не читается.
+    Записанный набор кладется в кеш prefetch_related объекта.
+    """
+    manager = getattr(instance, field_name)
+    through = manager.through
+    source = manager.source_field_name
+    target = manager.target_field_name
+    new_ids = {obj.pk for obj in objects}
+    prefetched = getattr(instance, '_prefetched_objects_cache', {})
+    if created:
+        old_ids = set()
+    elif manager.prefetch_cache_name in prefetched:
+        old_ids = {obj.pk for obj in prefetched[manager.prefetch_cache_name]}
+    else:
+        old_ids = set(through.objects.filter(
+            **{source: instance.pk}
+        ).values_list(f'{target}_id', flat=True))
+
+    removed = old_ids - new_ids
+    added = new_ids - old_ids
+    if removed:
+        through.objects.filter(
+            **{source: instance.pk, f'{target}__in': removed}
+        ).delete()
+        m2m_changed.send(
+            sender=through, instance=instance, action='post_remove',
+            reverse=False, model=manager.model, pk_set=removed,
+            using=manager.db
+        )
+    if added:
+        through.objects.bulk_create(
+            through(**{f'{source}_id': instance.pk, f'{target}_id': pk})
+            for pk in added
+        )
+        m2m_changed.send(
+            sender=through, instance=instance, action='post_add',
+            reverse=False, model=manager.model, pk_set=added,
+            using=manager.db
+        )
+    cache_related(instance, field_name, objects)
+
+
+def cache_related(instance, field_name, objects):
+    """Кладет известный набор связанных объектов в кеш prefetch_related."""
+    manager = getattr(instance, field_name)
+    prefetched = getattr(instance, '_prefetched_objects_cache', {})
+    prefetched.pop(manager.prefetch_cache_name, None)
+    related = manager.get_queryset()
+    related._result_cache = list(objects)
+    related._prefetch_done = True
+    prefetched[manager.prefetch_cache_name] = related
+    instance._prefetched_objects_cache = prefetched
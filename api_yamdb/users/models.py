@@ -42,6 +42,25 @@ class User(AbstractUser):
         default=USER
     )
 
+    # Поля, от которых зависят права; их копия хранится в JWT.
+    TOKEN_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_fields = {
+            field: instance.__dict__.get(field) for field in cls.TOKEN_FIELDS
+        }
+        return instance
+
+    def token_fields_changed(self):
+        loaded = getattr(self, '_loaded_token_fields', None)
+        if loaded is None:
+            return False
+        return any(
+            getattr(self, field) != value for field, value in loaded.items()
+        )
+
     @property
     def is_user(self):
         return self.role == self.USER
@@ -58,3 +77,27 @@ class User(AbstractUser):
         ordering = ['-id']
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+
+
+class TokenRevocation(models.Model):
+    """
+    Отзыв JWT пользователя: токены, выданные до revoked, недействительны.
+
+    Хранит id без внешнего ключа, чтобы запись пережила удаление
+    пользователя.
+    """
+    user_id = models.BigIntegerField(
+        primary_key=True,
+        verbose_name='Пользователь',
+    )
+    revoked = models.FloatField(
+        db_index=True,
+        verbose_name='Время отзыва (Unix)',
+    )
+
+    class Meta:
+        verbose_name = 'Отзыв токенов'
+        verbose_name_plural = 'Отзывы токенов'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.revoked}'
@@ -0,0 +1,19 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Кэш ответов, корзины ограничения частоты и копия отзывов токенов
+    не переходят между тестами.
+    """
+    from api.authentication import revocations
+
+    for cache in caches.all():
+        cache.clear()
+    revocations.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+    revocations.clear()
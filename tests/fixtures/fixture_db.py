@@ -0,0 +1,19 @@
+import pytest
+from django.conf import settings
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix,
+                                 tmp_path_factory):
+    """
+    Тестовая база SQLite - файл во временном каталоге запуска.
+
+    В памяти параллельные соединения test_28 получают «database table
+    is locked» вместо ожидания; свой каталог у каждого запуска не дает
+    параллельным запускам делить одну базу и не оставляет файл в проекте.
+    """
+    for alias, database in settings.DATABASES.items():
+        if database['ENGINE'] == 'django.db.backends.sqlite3':
+            database.setdefault('TEST', {})['NAME'] = str(
+                tmp_path_factory.mktemp('db') / f'test_{alias}.sqlite3'
+            )
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def collect_pages(self, client, url):
+        results = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме `?cursor=` ответ не содержит '
+                '`count`: курсорная пагинация не считает строки.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_01_titles_cursor(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        results = self.collect_pages(client, '/api/v1/titles/?cursor=')
+        assert [item['name'] for item in results] == sorted(
+            title['name'] for title in titles
+        ), (
+            'Проверьте, что `/api/v1/titles/?cursor=` возвращает '
+            'произведения, упорядоченные по названию.'
+        )
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Без параметра `cursor` пагинация `/api/v1/titles/` '
+            'не должна меняться.'
+        )
+
+    def test_02_reviews_and_comments_cursor(self, admin_client, admin, user,
+                                            user_client, moderator,
+                                            moderator_client, client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        results = self.collect_pages(client, f'{url}?cursor=')
+        assert [item['id'] for item in results] == [
+            review['id'] for review in reversed(reviews)
+        ], (
+            f'Проверьте, что `{url}?cursor=` возвращает отзывы от новых '
+            'к старым.'
+        )
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        results = self.collect_pages(client, f'{url}?cursor=')
+        assert [item['id'] for item in results] == [
+            comment['id'] for comment in reversed(comments)
+        ], (
+            f'Проверьте, что `{url}?cursor=` возвращает комментарии от '
+            'новых к старым.'
+        )
+
+    def test_03_titles_with_equal_names(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name='Одно имя', year=2000) for _ in range(35)
+        )
+        Title.objects.create(name='Другое имя', year=2000)
+        ids = list(Title.objects.order_by('name', 'id').values_list(
+            'id', flat=True
+        ))
+        pages = []
+        url = '/api/v1/titles/?cursor='
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                data = client.get(url).json()
+            assert not any(
+                'OFFSET' in query['sql'] for query in context.captured_queries
+            ), 'Курсорная страница не должна использовать OFFSET.'
+            pages.append(data)
+            url = data['next']
+        assert [
+            item['id'] for page in pages for item in page['results']
+        ] == ids, (
+            'Проверьте, что курсор по (name, id) проходит серию '
+            'одинаковых названий без повторов и пропусков.'
+        )
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что неверный курсор дает 404, а не 500.'
+        )
@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_name_and_description(self, admin_client, client):
+        create_titles(admin_client)
+        assert self.search(client, 'терминатор') == ['Терминатор'], (
+            'Проверьте, что `?q=` ищет по названию без учета регистра.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что `?q=` ищет по описанию произведения.'
+        )
+        assert self.search(client, 'креп') == ['Крепкий орешек'], (
+            'Проверьте, что `?q=` находит произведения по началу слова.'
+        )
+        assert self.search(client, '"*') == [], (
+            'Проверьте, что `?q=` без слов не возвращает произведений.'
+        )
+
+    def test_02_search_index_follows_changes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Чужие'})
+        assert self.search(client, 'терминатор') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        assert self.search(client, 'чужие') == ['Чужие']
+        admin_client.delete(url)
+        assert self.search(client, 'чужие') == [], (
+            'Проверьте, что произведение удаляется из поискового индекса.'
+        )
@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+CACHE_BACKENDS = (
+    {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-response-cache',
+    },
+    {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': None,
+    },
+)
+
+
+@pytest.fixture(params=CACHE_BACKENDS, ids=('locmem', 'filebased'))
+def cache_backend(request, settings, tmp_path):
+    backend = dict(request.param)
+    if backend['LOCATION'] is None:
+        backend['LOCATION'] = str(tmp_path / 'cache')
+    settings.CACHES = {'default': backend}
+    return backend
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    def test_01_cached_read_with_one_query(self, cache_backend,
+                                            admin_client, client,
+                                            django_assert_num_queries):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/categories/',
+                    '/api/v1/genres/'):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            # Единственный запрос читает версии из общей таблицы.
+            with django_assert_num_queries(1):
+                cached = client.get(url)
+            assert cached.json() == response.json(), (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдается '
+                'из кэша: к базе только запрос версий данных.'
+            )
+
+    def test_02_writes_invalidate_cache(self, cache_backend, admin_client,
+                                        user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        assert client.get(url).json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений.'
+        )
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        slugs = [
+            category['slug']
+            for category in client.get('/api/v1/categories/').json()[
+                'results'
+            ]
+        ]
+        assert 'music' in slugs, (
+            'Проверьте, что создание категории сбрасывает кэш категорий.'
+        )
+
+        admin_client.patch(url, data={'genre': ['drama']})
+        genres = [genre['slug'] for genre in client.get(url).json()['genre']]
+        assert genres == ['drama'], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш.'
+        )
+
+    def test_03_write_in_other_worker(self, settings, admin_client,
+                                      user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        worker_b = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'worker-b',
+        }}
+        settings.CACHES = worker_b
+        assert client.get(url).json()['rating'] is None
+
+        # Отзыв принимает другой воркер со своим кэшем в памяти.
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'worker-a',
+        }}
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+
+        settings.CACHES = worker_b
+        assert client.get(url).json()['rating'] == 9, (
+            'Проверьте, что запись в одном процессе сбрасывает кэш ответов '
+            'в других: версии должны храниться в общем хранилище.'
+        )
+
+    def test_04_links_follow_host(self, cache_backend, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?limit=1'
+        for host in ('a.example', 'b.example'):
+            response = client.get(url, HTTP_HOST=host)
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['next'].startswith(f'http://{host}/'), (
+                'Проверьте, что кэш ответов различает хосты: ссылки '
+                '`next` и `previous` в ответе абсолютные.'
+            )
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def test_01_not_modified(self, admin_client, admin, user, user_client,
+                             client, django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        comment_url = f'{review_url}comments/{comments[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/', title_url,
+            f'{title_url}reviews/', review_url,
+            f'{review_url}comments/', comment_url,
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etag = response.get('ETag')
+            assert etag, (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `ETag`.'
+            )
+            # Единственный запрос читает версии из общей таблицы.
+            with django_assert_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает 304 без выборки и сериализации.'
+            )
+
+    def test_02_etag_changes_on_write(self, admin_client, admin, user,
+                                      user_client, client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        etag = client.get(url)['ETag']
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'Новый'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления комментария `ETag` меняется.'
+        )
+        assert response['ETag'] != etag
+
+    def test_03_etag_scoped_to_title(self, admin_client, admin, user,
+                                     user_client, client):
+        from tests.utils import create_single_review
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        first_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        second_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        first_etag = client.get(first_url)['ETag']
+        second_etag = client.get(second_url)['ETag']
+
+        create_single_review(admin_client, titles[1]['id'], 'Новый', 5)
+        admin_client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        response = client.get(first_url, HTTP_IF_NONE_MATCH=first_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв к другому произведению и регистрация '
+            'не меняют `ETag` отзывов этого произведения.'
+        )
+        response = client.get(second_url, HTTP_IF_NONE_MATCH=second_etag)
+        assert response.status_code == HTTPStatus.OK
+
+        first_etag = client.get(first_url)['ETag']
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        response = client.get(first_url, HTTP_IF_NONE_MATCH=first_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени автора меняет `ETag` отзывов.'
+        )
+
+    def test_04_wildcard_needs_existing_resource(self, admin_client, admin,
+                                                 user, user_client, client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        for url in (
+            '/api/v1/titles/999/',
+            f'{title_url}reviews/999/',
+            f'{review_url}comments/999/',
+            '/api/v1/titles/999/reviews/',
+        ):
+            response = client.get(url, HTTP_IF_NONE_MATCH='*')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `If-None-Match: *` для `{url}` дает 404: '
+                'ресурса нет, совпадать не с чем.'
+            )
+        response = client.get(review_url, HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
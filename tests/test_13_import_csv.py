@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCsv:
+
+    def test_01_import_static_data(self):
+        from reviews.models import Comment, Genre, Review, Title
+        from users.models import User
+
+        call_command('import_csv', batch_size=10)
+
+        assert User.objects.count() == 5
+        assert Genre.objects.count() == 15
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        title = Title.objects.get(pk=1)
+        assert title.genre.count() == 1
+        assert (title.rating_count, title.rating) == (2, 10), (
+            'Проверьте, что после загрузки пересчитываются рейтинги.'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что при загрузке сохраняется `pub_date` из файла.'
+        )
+
+    def test_02_import_is_idempotent(self):
+        from reviews.models import Review
+
+        call_command('import_csv')
+        call_command('import_csv')
+        assert Review.objects.count() == 72
+
+    def test_03_import_into_filled_database(self):
+        from reviews.models import Comment, Review, Title
+
+        call_command(
+            'generate_dataset', titles=40, reviews_per_title=2, users=10,
+            comments_per_review=1
+        )
+        counts = (
+            Title.objects.count(), Review.objects.count(),
+            Comment.objects.count()
+        )
+        call_command('import_csv')
+        assert (
+            Title.objects.count(), Review.objects.count(),
+            Comment.objects.count()
+        ) == (counts[0] + 32, counts[1] + 72, counts[2] + 3), (
+            'Проверьте, что строки файла, чьи id уже заняты, получают '
+            'новые id, а не пропускаются.'
+        )
+        title = Title.objects.get(name='Побег из Шоушенка')
+        assert title.genre.count() == 1
+        assert (title.rating_count, title.rating) == (2, 10), (
+            'Проверьте, что жанры и отзывы из файла привязываются к '
+            'загруженному произведению, а не к строке с тем же id.'
+        )
+        call_command('import_csv')
+        assert Comment.objects.count() == counts[2] + 3
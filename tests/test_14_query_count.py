@@ -0,0 +1,160 @@
+import itertools
+import json
+
+import pytest
+
+SEED_SIZE = 3
+
+counter = itertools.count()
+
+
+def seed(size):
+    """Создает size произведений, отзывов к первому из них и комментариев."""
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import User
+
+    category, _ = Category.objects.get_or_create(slug='films', name='Фильм')
+    genres = [
+        Genre.objects.get_or_create(slug=slug, name=slug)[0]
+        for slug in ('drama', 'comedy')
+    ]
+    titles = []
+    for _ in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {next(counter)}', year=2000,
+            category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    first_title = Title.objects.order_by('pk').first()
+    first_review = Review.objects.order_by('pk').first()
+    for _ in range(size):
+        number = next(counter)
+        author = User.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=first_title, author=author, text='Отзыв', score=5
+        )
+        first_review = first_review or review
+        Comment.objects.create(review=first_review, author=author, text='-')
+    return first_title, first_review
+
+
+def get_urls(title, review):
+    """GET-адреса по именам маршрутов роутера."""
+    from reviews.models import Comment
+
+    comment = Comment.objects.filter(review=review).first()
+    base = f'/api/v1/titles/{title.pk}/reviews/'
+    return {
+        'api-root': ('/api/v1/',),
+        'user-list': ('/api/v1/users/',),
+        'user-me-info': ('/api/v1/users/me/',),
+        'user-detail': ('/api/v1/users/TestAdmin/',),
+        'categories-list': ('/api/v1/categories/',),
+        'genres-list': ('/api/v1/genres/',),
+        'titles-list': ('/api/v1/titles/',
+                        '/api/v1/titles/?genre=drama&category=films'),
+        'titles-detail': (f'/api/v1/titles/{title.pk}/',),
+        'titles-top': ('/api/v1/titles/top/',
+                       '/api/v1/titles/top/?genre=drama'),
+        'titles-export': ('/api/v1/titles/export/',
+                          '/api/v1/titles/export/?type=csv'),
+        'reviews-list': (base,),
+        'reviews-detail': (f'{base}{review.pk}/',),
+        'comments-list': (f'{base}{review.pk}/comments/',),
+        'comments-detail': (f'{base}{review.pk}/comments/{comment.pk}/',),
+    }
+
+
+# Маршруты без GET: у категорий и жанров по slug есть только DELETE,
+# пакетное создание проверяет test_03_bulk_create_queries.
+NON_GET_ROUTES = {'categories-detail', 'genres-detail', 'titles-bulk'}
+
+
+def count_queries(client, method, url, **kwargs):
+    """Число запросов к БД, включая чтение потокового ответа."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code in (200, 201), url
+    return len(context.captured_queries)
+
+
+def measure(client, urls):
+    counts = {}
+    for url in itertools.chain.from_iterable(urls.values()):
+        # Первый запрос к топу создает его; считается повторный.
+        client.get(url)
+        counts[url] = count_queries(client, 'get', url)
+    return counts
+
+
+@pytest.fixture
+def query_count_settings(settings):
+    settings.QUERY_COUNT_HEADER = True
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14QueryCount:
+
+    def test_01_header(self, query_count_settings, client):
+        response = client.get('/api/v1/titles/')
+        assert response['X-DB-Query-Count'].isdigit()
+        assert float(response['X-DB-Query-Time']) >= 0
+
+    def test_02_constant_queries(self, query_count_settings, admin,
+                                 admin_client):
+        from api.urls import router
+
+        title, review = seed(SEED_SIZE)
+        urls = get_urls(title, review)
+        assert {
+            pattern.name for pattern in router.urls if pattern.name
+        } == set(urls) | NON_GET_ROUTES, (
+            'Добавьте новые маршруты роутера, включая action, в проверку '
+            'числа запросов.'
+        )
+
+        small = measure(admin_client, urls)
+        seed(SEED_SIZE * 9)
+        large = measure(admin_client, urls)
+        for url, count in small.items():
+            assert large[url] == count, (
+                f'Число запросов к `{url}` растет вместе с данными: '
+                f'{count} при {SEED_SIZE} и {large[url]} при '
+                f'{SEED_SIZE * 10} объектах.'
+            )
+
+    def test_03_bulk_create_queries(self, query_count_settings,
+                                    admin_client):
+        seed(1)
+
+        def post_batch(size):
+            data = [
+                {'name': f'Пакет {next(counter)}', 'year': 2000,
+                 'genre': ['drama', 'comedy'], 'category': 'films'}
+                for _ in range(size)
+            ]
+            return count_queries(
+                admin_client, 'post', '/api/v1/titles/bulk/',
+                data=json.dumps(data), content_type='application/json'
+            )
+
+        small = post_batch(SEED_SIZE)
+        large = post_batch(SEED_SIZE * 10)
+        assert large == small, (
+            'Число запросов пакетного создания растет вместе с пакетом: '
+            f'{small} при {SEED_SIZE} и {large} при {SEED_SIZE * 10} '
+            'произведениях.'
+        )
@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+
+
+def generate(seed):
+    from reviews.models import Comment, Review, Title
+    from users.models import User
+
+    for model in (Comment, Review, Title, User):
+        model.objects.all().delete()
+    call_command(
+        'generate_dataset', titles=20, reviews_per_title=5,
+        comments_per_review=2, users=10, seed=seed, batch_size=7
+    )
+    return list(
+        Review.objects.order_by('title__name', 'author__username', 'score')
+        .values_list('title__name', 'author__username', 'score', 'pub_date')
+    ), Comment.objects.count()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15GenerateDataset:
+
+    def test_01_counts_and_skew(self):
+        from reviews.models import Review, Title
+        from users.models import User
+
+        call_command(
+            'generate_dataset', titles=20, reviews_per_title=5,
+            comments_per_review=0, users=10, seed=1
+        )
+        assert Title.objects.count() == 20
+        assert User.objects.count() == 10
+        assert Review.objects.count() == 100, (
+            'Проверьте, что генератор создает titles * reviews-per-title '
+            'отзывов.'
+        )
+        counts = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True
+        )
+        assert counts[0] == 10 and counts[-1] < counts[0], (
+            'Проверьте, что отзывы распределены неравномерно и рейтинги '
+            'пересчитаны после генерации.'
+        )
+
+    def test_02_seed_is_deterministic(self):
+        assert generate(5) == generate(5), (
+            'Проверьте, что при одинаковом `--seed` генерируются '
+            'одинаковые данные.'
+        )
+
+    @pytest.mark.parametrize('option', (
+        'reviews_per_title', 'comments_per_review'
+    ))
+    def test_03_negative_counts(self, option):
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            call_command(
+                'generate_dataset', titles=1, users=1, **{option: -1}
+            )
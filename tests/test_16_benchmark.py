@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def test_01_benchmark_report_and_baseline(self, tmp_path):
+        from reviews.models import Review
+
+        call_command(
+            'generate_dataset', titles=10, reviews_per_title=3,
+            comments_per_review=1, users=10, seed=1
+        )
+        reviews = Review.objects.count()
+        output = tmp_path / 'result.json'
+        call_command(
+            'benchmark', requests=60, warmup=5, output=str(output)
+        )
+        result = json.loads(output.read_text(encoding='utf-8'))
+        assert result['meta']['requests'] == 60
+        for name, item in result['endpoints'].items():
+            assert {'p50_ms', 'p95_ms', 'p99_ms', 'rps',
+                    'queries_per_request'} <= set(item), name
+            assert item['errors'] == 0, (
+                f'Сценарий `{name}` завершился ошибкой сервера.'
+            )
+        assert Review.objects.count() == reviews, (
+            'Проверьте, что бенчмарк откатывает созданные им данные.'
+        )
+        call_command(
+            'benchmark', requests=60, warmup=5, baseline=str(output),
+            threshold=100
+        )
+
+    def test_02_tokens_use_fast_path(self):
+        from django.db import transaction
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from api.authentication import TOKEN_CLAIMS
+        from api.management.commands.benchmark import Command
+
+        call_command(
+            'generate_dataset', titles=2, reviews_per_title=1,
+            comments_per_review=0, users=2, seed=1
+        )
+        command = Command()
+        with transaction.atomic():
+            command.prepare()
+            transaction.set_rollback(True)
+        token = AccessToken(command.tokens[0])
+        assert all(claim in token for claim in TOKEN_CLAIMS), (
+            'Проверьте, что бенчмарк выдает токены с claims: иначе '
+            'review_post не измеряет быстрый путь аутентификации.'
+        )
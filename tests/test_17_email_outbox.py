@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    valid_data = {
+        'email': 'outbox@yamdb.fake',
+        'username': 'outbox_user'
+    }
+
+    def test_01_signup_enqueues_email(self, client):
+        from emails.models import OutgoingEmail
+
+        response = client.post(self.url_signup, data=self.valid_data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо внутри запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipients == [self.valid_data['email']]
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [self.valid_data['email']]
+        email.refresh_from_db()
+        assert email.sent is not None, (
+            'Проверьте, что отправленное письмо помечается в очереди.'
+        )
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что письмо не отправляется повторно.'
+        )
+
+    def test_02_failed_email_is_retried(self, client, monkeypatch):
+        from emails.models import OutgoingEmail
+
+        client.post(self.url_signup, data=self.valid_data)
+
+        def broken_send(self, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'send_messages', broken_send)
+            call_command('send_emails')
+        email = OutgoingEmail.objects.get()
+        assert (email.attempts, email.sent) == (1, None)
+        assert 'SMTP' in email.last_error
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что повторная попытка ждет задержку.'
+        )
+        OutgoingEmail.objects.update(next_attempt=email.created)
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что письмо отправляется повторно после ошибки.'
+        )
+
+    def test_03_no_transaction_while_sending(self, client, monkeypatch):
+        from django.db import connection
+
+        client.post(self.url_signup, data=self.valid_data)
+        in_transaction = []
+        send_messages = EmailBackend.send_messages
+
+        def send_and_check(self, messages):
+            in_transaction.append(connection.in_atomic_block)
+            # Запись из другого запроса во время отправки проходит.
+            response = client.post('/api/v1/auth/signup/', data={
+                'email': 'parallel@yamdb.fake', 'username': 'parallel'
+            })
+            assert response.status_code == HTTPStatus.OK
+            return send_messages(self, messages)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'send_messages', send_and_check)
+            call_command('send_emails', batch_size=1)
+        assert in_transaction and not any(in_transaction), (
+            'Проверьте, что письма отправляются вне транзакции: иначе '
+            'медленный почтовый сервер блокирует запись в базу.'
+        )
+
+    def test_04_connection_error_is_retried(self, client, monkeypatch):
+        from emails.models import OutgoingEmail
+
+        client.post(self.url_signup, data=self.valid_data)
+
+        def broken_open(self):
+            raise ConnectionRefusedError('SMTP не отвечает')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'open', broken_open, raising=False)
+            call_command('send_emails')
+        email = OutgoingEmail.objects.get()
+        assert (email.attempts, email.sent) == (1, None), (
+            'Проверьте, что ошибка соединения засчитывается как неудачная '
+            'попытка, а не завершает воркер.'
+        )
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt > email.created
@@ -0,0 +1,80 @@
+import io
+import json
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+BASELINE = Path(__file__).parent / 'fixtures' / 'signup_baseline.json'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SignupLoad:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_queries(self, client, django_assert_max_num_queries):
+        data = {'username': 'fast_signup', 'email': 'fast@yamdb.fake'}
+        # BEGIN, SELECT по username/email, INSERT пользователя и письма.
+        with django_assert_max_num_queries(4):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+        # Повторный запрос кода: BEGIN, SELECT и INSERT письма.
+        with django_assert_max_num_queries(3):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_signup_load(self, tmp_path):
+        """
+        Сравнивает регистрацию с замером до перехода на один запрос.
+
+        signup_baseline.json снят командой ``benchmark --mix signup=1
+        --requests 2000`` на коде с двумя get_or_create: 8 запросов к БД
+        и около 190 регистраций в секунду.
+        """
+        call_command(
+            'generate_dataset', titles=5, reviews_per_title=1, users=5,
+            comments_per_review=0
+        )
+        output = tmp_path / 'signup.json'
+        call_command(
+            'benchmark', requests=200, warmup=10, mix='signup=1',
+            output=str(output), baseline=str(BASELINE), stdout=io.StringIO()
+        )
+        results = json.loads(output.read_text())
+        signup = results['endpoints']['signup']
+        baseline = json.loads(BASELINE.read_text())['endpoints']['signup']
+        assert signup['errors'] == 0
+        comparison = results['comparison']['signup']
+        assert comparison['rps'] == [baseline['rps'], signup['rps']], (
+            'Проверьте, что сравнение хранит пропускную способность '
+            'до и после.'
+        )
+        assert signup['rps'] > 0
+        assert comparison['queries_per_request'] == [
+            baseline['queries_per_request'], signup['queries_per_request']
+        ]
+        assert signup['queries_per_request'] <= 5 < (
+            baseline['queries_per_request']
+        ), (
+            'Регистрация должна укладываться в одну транзакцию: '
+            'savepoint, SELECT, два INSERT и release.'
+        )
+
+    def test_03_taken_username_or_email(self, client):
+        client.post(
+            self.url_signup,
+            data={'username': 'taken', 'email': 'taken@yamdb.fake'}
+        )
+        for data in (
+            {'username': 'taken', 'email': 'other@yamdb.fake'},
+            {'username': 'other', 'email': 'taken@yamdb.fake'},
+        ):
+            response = client.post(self.url_signup, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert response.json() == {
+                'non_field_errors': ['Это имя или email уже занято']
+            }, (
+                'Проверьте, что занятые имя или email дают ошибку в '
+                '`non_field_errors`, как и прежде.'
+            )
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+def get_client(user):
+    from api.authentication import YamdbAccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {YamdbAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19StatelessJWT:
+
+    def test_01_token_has_claims(self, client, user):
+        from django.contrib.auth.tokens import default_token_generator
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert (token['username'], token['role'], token['is_superuser']) == (
+            user.username, user.role, user.is_superuser
+        )
+
+    def test_02_no_user_query(self, admin_client, admin, user):
+        titles, _, _ = create_titles(admin_client)
+        user_client = get_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ок', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        assert not any(
+            query['sql'].startswith('SELECT "users_user"')
+            for query in context.captured_queries
+        ), 'Пользователь с claims в токене не должен читаться из базы.'
+
+    def test_03_role_change_and_delete(self, admin):
+        admin_client = get_client(admin)
+        data = {'name': 'Музыка', 'slug': 'music'}
+        response = admin_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == HTTPStatus.CREATED
+
+        admin.role = admin.USER
+        admin.save()
+        data = {'name': 'Игры', 'slug': 'games'}
+        response = admin_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что смена роли сразу действует на выданные токены.'
+        )
+
+        admin.delete()
+        response = admin_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удаленного пользователя не принимается.'
+        )
+
+    def test_04_revocation_survives_cache_eviction(self, admin):
+        from django.core.cache import cache
+
+        from api.authentication import revocations
+
+        admin_client = get_client(admin)
+        admin.role = admin.USER
+        admin.save()
+        # Кэш ответов переполнен и очищен, а другой воркер еще не видел
+        # отзыв: его копия списка пуста.
+        for index in range(400):
+            cache.set(f'filler:{index}', index)
+        cache.clear()
+        revocations.clear()
+        data = {'name': 'Игры', 'slug': 'games'}
+        response = admin_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что отзыв токенов хранится в базе, а не в '
+            'вытесняемом кэше процесса.'
+        )
+
+    def test_05_revocations_read_periodically(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        user_client = get_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            for _ in range(3):
+                user_client.get(url)
+        assert not any(
+            'users_tokenrevocation' in query['sql']
+            for query in context.captured_queries
+        ), 'Список отзывов токенов не должен читаться на каждый запрос.'
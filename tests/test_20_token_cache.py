@@ -0,0 +1,43 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+
+class Test20TokenCache:
+
+    def make_token(self, lifetime=60):
+        return {'exp': time.time() + lifetime}
+
+    def test_01_lru_and_ttl(self):
+        from api.authentication import TokenCache
+
+        cache = TokenCache(maxsize=2)
+        cache.set(b'a', self.make_token())
+        cache.set(b'b', self.make_token())
+        assert cache.get(b'a') is not None
+        cache.set(b'c', self.make_token())
+        assert cache.get(b'b') is None, (
+            'Проверьте, что при переполнении вытесняется давно не '
+            'использованный токен.'
+        )
+        cache.set(b'd', self.make_token(lifetime=-1))
+        assert cache.get(b'd') is None, (
+            'Проверьте, что истекший токен не возвращается из кэша.'
+        )
+        assert cache.stats() == {
+            'size': 1, 'maxsize': 2, 'hits': 1, 'misses': 2, 'evictions': 3
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_requests_reuse_verified_token(self, user_client):
+        from api.authentication import token_cache
+
+        token_cache.clear()
+        for _ in range(3):
+            response = user_client.get('/api/v1/users/me/')
+            assert response.status_code == HTTPStatus.OK
+        stats = token_cache.stats()
+        assert (stats['misses'], stats['hits']) == (1, 2), (
+            'Проверьте, что подпись токена проверяется один раз.'
+        )
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def small_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'signup': '2/min', 'token': '2/min', 'writes': '2/min'
+        },
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Throttling:
+
+    def test_01_signup_and_token_per_ip(self, small_rates, client):
+        for url in ('/api/v1/auth/signup/', '/api/v1/auth/token/'):
+            statuses = [
+                client.post(url, data={}).status_code for _ in range(3)
+            ]
+            assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+                f'Проверьте, что частота запросов к `{url}` ограничена.'
+            )
+            assert HTTPStatus.TOO_MANY_REQUESTS not in statuses[:2]
+        response = client.post(
+            '/api/v1/auth/signup/', data={}, REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что ограничение считается по IP-адресу.'
+        )
+
+    def test_02_writes_per_user(self, small_rates, admin_client, user_client,
+                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        statuses = []
+        for title in titles + titles[:1]:
+            statuses.append(user_client.post(
+                f'/api/v1/titles/{title["id"]}/reviews/',
+                data={'text': 'Ок', 'score': 5}
+            ).status_code)
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что создание отзывов ограничено по пользователю.'
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Чтение отзывов не должно ограничиваться.'
+        )
+        response = moderator_client.post(url, data={'text': 'Ок', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что у каждого пользователя своя корзина.'
+        )
+
+    def test_03_forwarded_for_is_ignored(self, small_rates, client):
+        statuses = [
+            client.post(
+                '/api/v1/auth/signup/', data={},
+                HTTP_X_FORWARDED_FOR=f'10.1.0.{index}'
+            ).status_code
+            for index in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подделанный X-Forwarded-For не обходит '
+            'ограничение: без доверенных прокси (NUM_PROXIES) адрес '
+            'берется из REMOTE_ADDR.'
+        )
+
+    def test_04_buckets_survive_response_cache(self, small_rates, client):
+        from django.core.cache import cache
+
+        for _ in range(2):
+            client.post('/api/v1/auth/token/', data={})
+        for index in range(400):
+            cache.set(f'api:response:{index}', index)
+        cache.clear()
+        response = client.post('/api/v1/auth/token/', data={})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что корзины хранятся отдельно от кэша ответов.'
+        )
+
+    def test_05_concurrent_requests(self, small_rates):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from rest_framework.test import APIRequestFactory
+
+        from api.throttling import SignupThrottle
+
+        factory = APIRequestFactory()
+
+        def allowed(_):
+            request = factory.post('/api/v1/auth/signup/')
+            return SignupThrottle().allow_request(request, None)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(allowed, range(32)))
+        assert sum(results) == 2, (
+            'Проверьте, что параллельные запросы не расходуют один и тот '
+            'же токен корзины.'
+        )
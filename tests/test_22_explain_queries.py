@@ -0,0 +1,30 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ExplainQueries:
+
+    def test_01_reviews_and_comments_use_indexes(self):
+        call_command(
+            'generate_dataset', titles=10, reviews_per_title=3,
+            comments_per_review=1, users=10, seed=1
+        )
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+        assert 'review_title_pub_date_idx' in output, (
+            'Проверьте, что список отзывов использует индекс '
+            '(title_id, pub_date).'
+        )
+        assert 'comment_review_pub_date_idx' in output, (
+            'Проверьте, что список комментариев использует индекс '
+            '(review_id, pub_date).'
+        )
+        for table in ('reviews_review', 'reviews_comment'):
+            assert f'SCAN {table}  <-' not in output, (
+                f'Проверьте, что запросы не сканируют таблицу `{table}` '
+                'целиком.'
+            )
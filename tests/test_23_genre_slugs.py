@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+
+def genre_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and 'FROM "reviews_genre"' in
+        query['sql']
+    ]
+
+
+def through_writes(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith((
+            'INSERT INTO "reviews_title_genre"',
+            'DELETE FROM "reviews_title_genre"',
+        ))
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23GenreSlugs:
+
+    def create_title(self, admin_client, genres):
+        return admin_client.post('/api/v1/titles/', data={
+            'name': 'Поворот', 'year': 2000,
+            'genre': genres, 'category': 'films',
+        }, format='json')
+
+    def test_01_create_resolves_slugs_in_one_query(self, admin_client):
+        create_categories(admin_client)
+        genres = [genre['slug'] for genre in create_genre(admin_client)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.create_title(admin_client, genres)
+        assert response.status_code == HTTPStatus.CREATED
+        assert sorted(response.json()['genre']) == sorted(genres)
+        assert len(genre_queries(context)) == 1, (
+            'Проверьте, что slug жанров разрешаются одним запросом.'
+        )
+        assert len(through_writes(context)) == 1, (
+            'Проверьте, что связи с жанрами вставляются одним запросом.'
+        )
+
+    def test_02_all_missing_slugs_reported(self, admin_client):
+        from reviews.models import Title
+
+        create_categories(admin_client)
+        genres = [genre['slug'] for genre in create_genre(admin_client)]
+        response = self.create_title(
+            admin_client, [genres[0], 'missing-one', 'missing-two']
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        message = str(response.json()['genre'])
+        assert 'missing-one' in message and 'missing-two' in message, (
+            'Проверьте, что в ошибке перечислены все ненайденные slug.'
+        )
+        response = self.create_title(admin_client, 'drama')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Title.objects.exists()
+
+    def test_03_update_writes_diff(self, admin_client):
+        from reviews.models import Title
+
+        create_categories(admin_client)
+        genres = [genre['slug'] for genre in create_genre(admin_client)]
+        title_id = self.create_title(admin_client, genres[:2]).json()['id']
+        url = f'/api/v1/titles/{title_id}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': genres[1:]}, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert sorted(response.json()['genre']) == sorted(genres[1:])
+        writes = through_writes(context)
+        assert len(writes) == 2, (
+            'Проверьте, что при обновлении удаляются только убранные жанры '
+            'и вставляются только новые.'
+        )
+        assert set(
+            Title.objects.get(pk=title_id).genre.values_list('slug', flat=True)
+        ) == set(genres[1:])
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': genres[1:]}, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not through_writes(context), (
+            'Проверьте, что неизменный набор жанров не перезаписывается.'
+        )
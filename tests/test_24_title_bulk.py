@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+URL = '/api/v1/titles/bulk/'
+
+
+def make_items(count, genres, category='films'):
+    return [
+        {
+            'name': f'Произведение {index}', 'year': 2000,
+            'genre': genres, 'category': category,
+        }
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleBulk:
+
+    @pytest.fixture(autouse=True)
+    def dictionaries(self, admin_client):
+        create_categories(admin_client)
+        self.genres = [genre['slug'] for genre in create_genre(admin_client)]
+
+    def test_01_bulk_create(self, admin_client):
+        from reviews.models import Title
+
+        items = make_items(300, self.genres[:2])
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        results = response.json()
+        assert len(results) == 300
+        assert all(item['status'] == HTTPStatus.CREATED for item in results)
+        ids = [item['data']['id'] for item in results]
+        titles = Title.objects.in_bulk(ids)
+        assert len(titles) == 300, (
+            'Проверьте, что в ответе id созданных произведений.'
+        )
+        for item in results[:3] + results[-3:]:
+            title = titles[item['data']['id']]
+            assert title.name == item['data']['name']
+            assert sorted(
+                title.genre.values_list('slug', flat=True)
+            ) == sorted(item['data']['genre'])
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT "reviews_')
+        ]
+        assert len(selects) == 2, (
+            'Проверьте, что категории и жанры пакета загружаются двумя '
+            'запросами.'
+        )
+        assert len(context.captured_queries) < 20, (
+            'Проверьте, что произведения вставляются через bulk_create.'
+        )
+        response = admin_client.get('/api/v1/titles/')
+        assert response.json()['count'] == 300, (
+            'Проверьте, что пакетное создание сбрасывает кеш ответов.'
+        )
+
+    def test_02_atomic_mode(self, admin_client):
+        from reviews.models import Title
+
+        items = make_items(3, self.genres)
+        items[1]['genre'] = ['unknown']
+        items[2]['category'] = 'unknown'
+        response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        statuses = [item['status'] for item in response.json()]
+        assert statuses == [
+            HTTPStatus.FAILED_DEPENDENCY, HTTPStatus.BAD_REQUEST,
+            HTTPStatus.BAD_REQUEST
+        ]
+        assert not Title.objects.exists(), (
+            'В режиме atomic при ошибках не должно создаваться ничего.'
+        )
+
+    def test_03_partial_mode(self, admin_client):
+        from reviews.models import Title
+
+        items = make_items(3, self.genres)
+        items[1]['genre'] = ['unknown']
+        response = admin_client.post(
+            f'{URL}?mode=partial', data=items, format='json'
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()
+        assert [item['status'] for item in results] == [
+            HTTPStatus.CREATED, HTTPStatus.BAD_REQUEST, HTTPStatus.CREATED
+        ]
+        assert 'genre' in results[1]['errors']
+        assert Title.objects.count() == 2
+
+    def test_04_permissions_and_input(self, admin_client, user_client):
+        response = user_client.post(
+            URL, data=make_items(1, self.genres), format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.post(URL, data={'name': 'x'}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(
+            f'{URL}?mode=any', data=[], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
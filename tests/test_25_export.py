@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/export/'
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Export:
+
+    def test_01_ndjson(self, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        response = admin_client.get(URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, 'Проверьте, что выгрузка потоковая.'
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [
+            json.loads(line) for line in read_stream(response).splitlines()
+        ]
+        assert [row['id'] for row in rows] == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        title = Title.objects.get(pk=rows[0]['id'])
+        assert rows[0] == {
+            'id': title.pk, 'name': title.name, 'year': title.year,
+            'description': title.description,
+            'category': title.category.slug,
+            'genre': sorted(title.genre.values_list('slug', flat=True)),
+            'rating': title.rating,
+        }
+
+    def test_02_csv_and_filters(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(f'{URL}?type=csv&category=books')
+        assert response.status_code == HTTPStatus.OK
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert rows and all(row['category'] == 'books' for row in rows), (
+            'Проверьте, что выгрузка учитывает фильтры списка произведений.'
+        )
+        response = admin_client.get(f'{URL}?type=xml')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_admin_only(self, client, user_client):
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(URL).status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_command_prefetches_per_chunk(self, tmp_path):
+        call_command(
+            'generate_dataset', titles=25, reviews_per_title=1,
+            comments_per_review=0, users=5, seed=1
+        )
+        output = tmp_path / 'titles.ndjson'
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'export_titles', output=str(output), chunk_size=10
+            )
+        rows = output.read_text(encoding='utf-8').splitlines()
+        assert len(rows) == 25
+        genre_queries = [
+            query for query in context.captured_queries
+            if 'FROM "reviews_genre"' in query['sql']
+        ]
+        assert len(genre_queries) == 3, (
+            'Проверьте, что жанры загружаются одним запросом на пачку.'
+        )
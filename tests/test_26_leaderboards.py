@@ -0,0 +1,237 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+URL = '/api/v1/titles/'
+
+
+def seed():
+    """Три произведения: у каждого свои оценки и число отзывов."""
+    from reviews.models import Category, Genre, Review, Title
+    from users.models import User
+
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книга', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    authors = [
+        User.objects.create_user(username=f'rater{index}',
+                                 email=f'rater{index}@yamdb.fake')
+        for index in range(3)
+    ]
+    titles = {}
+    for name, category, scores in (
+        ('Первое', films, (6, 6, 6)),
+        ('Второе', films, (9,)),
+        ('Третье', books, (8, 8)),
+    ):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set([drama])
+        for author, score in zip(authors, scores):
+            Review.objects.create(
+                title=title, author=author, text='-', score=score
+            )
+        titles[name] = title
+    return titles, authors
+
+
+def names(response):
+    return [entry['title']['name'] for entry in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Leaderboards:
+
+    def test_01_ordering(self, client):
+        from reviews.models import Title
+
+        seed()
+        response = client.get(f'{URL}?ordering=-rating')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Второе', 'Третье', 'Первое'
+        ]
+        response = client.get(f'{URL}?ordering=-review_count')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Первое', 'Третье', 'Второе'
+        ]
+        plan = Title.objects.order_by('-rating', '-pk')[:10].explain()
+        assert 'title_rating_idx' in plan, (
+            'Проверьте, что сортировка по рейтингу использует индекс.'
+        )
+
+    def test_02_top(self, client):
+        from reviews.models import Review
+
+        titles, authors = seed()
+        response = client.get(f'{URL}top/')
+        assert response.status_code == HTTPStatus.OK
+        assert names(response) == ['Второе', 'Третье', 'Первое']
+        assert response.json()[0]['value'] == 9
+        assert response.json()[0]['position'] == 1
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'{URL}top/')
+        assert not any(
+            query['sql'].startswith('DELETE')
+            for query in context.captured_queries
+        ), 'Проверьте, что не изменившийся топ не пересчитывается.'
+
+        Review.objects.create(
+            title=titles['Второе'], author=authors[1], text='-', score=1
+        )
+        assert names(client.get(f'{URL}top/')) == [
+            'Третье', 'Первое', 'Второе'
+        ], 'Проверьте, что новый отзыв обновляет топ.'
+
+        response = client.get(f'{URL}top/?by=review_count&limit=2')
+        assert [
+            (entry['title']['name'], entry['value'])
+            for entry in response.json()
+        ] == [('Первое', 3), ('Третье', 2)]
+
+    def test_03_scoped_top(self, client):
+        titles, _ = seed()
+        response = client.get(f'{URL}top/?category=films')
+        assert names(response) == ['Второе', 'Первое']
+        response = client.get(f'{URL}top/?genre=drama')
+        assert names(response) == ['Второе', 'Третье', 'Первое']
+
+        titles['Второе'].genre.clear()
+        assert names(client.get(f'{URL}top/?genre=drama')) == [
+            'Третье', 'Первое'
+        ], 'Проверьте, что смена жанров обновляет топ жанра.'
+        titles['Третье'].category = None
+        titles['Третье'].save()
+        assert 'Третье' not in names(client.get(f'{URL}top/?category=books'))
+
+    def test_04_bad_params(self, client):
+        seed()
+        assert client.get(f'{URL}top/?by=year').status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert client.get(f'{URL}top/?limit=0').status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert client.get(
+            f'{URL}top/?category=films&genre=drama'
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(f'{URL}top/?genre=none').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_05_ordering_with_cursor(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index}', year=2000,
+                  rating=None if index % 5 == 0 else index % 4 + 1)
+            for index in range(25)
+        )
+        titles = list(Title.objects.values('pk', 'rating'))
+        for ordering, descending in (('-rating', True), ('rating', False)):
+            expected = sorted(
+                titles,
+                key=lambda title: (title['rating'] or 0, title['pk']),
+                reverse=descending,
+            )
+            results = []
+            url = f'{URL}?ordering={ordering}&cursor='
+            while url:
+                data = client.get(url).json()
+                results.extend(data['results'])
+                url = data['next']
+            assert [title['id'] for title in results] == [
+                title['pk'] for title in expected
+            ], (
+                f'Проверьте, что `?ordering={ordering}&cursor=` листает '
+                'страницы в запрошенном порядке.'
+            )
+
+        response = client.get(f'{URL}?q=Произведение&cursor=')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсор с сортировкой по релевантности `?q=` '
+            'отклоняется, а не меняет порядок молча.'
+        )
+
+    def test_06_incremental_updates(self, client, settings):
+        import random
+
+        from reviews.models import (Category, Genre, Leaderboard,
+                                    LeaderboardEntry, Review, Title)
+        from users.models import User
+
+        settings.LEADERBOARD_SIZE = 3
+        rng = random.Random(1)
+        films = Category.objects.create(name='Фильм', slug='films')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        titles = []
+        for index in range(8):
+            # Порядок имен обратен порядку id: места должны идти по id.
+            title = Title.objects.create(
+                name=f'Произведение {9 - index}', year=2000,
+                category=films if index % 2 else None
+            )
+            if index % 3:
+                title.genre.set([drama])
+            titles.append(title)
+        authors = [
+            User.objects.create_user(username=f'rater{index}',
+                                     email=f'rater{index}@yamdb.fake')
+            for index in range(4)
+        ]
+        for kind in ('rating', 'review_count'):
+            for scope in ('', '&category=films', '&genre=drama'):
+                client.get(f'{URL}top/?by={kind}{scope}')
+
+        def check(step):
+            for board in Leaderboard.objects.all():
+                field = {
+                    'rating': 'rating', 'review_count': 'rating_count'
+                }[board.kind]
+                expected = Title.objects.filter(**{f'{field}__gt': 0})
+                if board.category_id:
+                    expected = expected.filter(category=board.category_id)
+                if board.genre_id:
+                    expected = expected.filter(genre=board.genre_id)
+                expected = list(expected.order_by(
+                    f'-{field}', '-pk'
+                ).values_list('pk', field)[:3])
+                assert list(board.entries.values_list(
+                    'title_id', 'value'
+                )) == expected, (
+                    f'Топ {board} разошелся с выборкой после шага {step}.'
+                )
+
+        for step in range(60):
+            action = rng.choice(('review', 'review', 'delete', 'move'))
+            title = rng.choice(titles)
+            if action == 'review':
+                review, _ = Review.objects.get_or_create(
+                    title=title, author=rng.choice(authors),
+                    defaults={'text': '-', 'score': 1}
+                )
+                review.score = rng.randint(1, 10)
+                review.save()
+            elif action == 'delete':
+                review = Review.objects.filter(title=title).first()
+                if review is not None:
+                    review.delete()
+            elif title.genre.exists():
+                title.genre.clear()
+            else:
+                title.refresh_from_db()
+                title.category = films
+                title.save()
+                title.genre.add(drama)
+            check(step)
+
+        titles.pop(rng.randrange(len(titles))).delete()
+        check('delete title')
+        LeaderboardEntry.objects.update(value=0)
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'{URL}top/?by=rating')
+        assert not any(
+            query['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')
+            for query in context.captured_queries
+        ), 'Проверьте, что чтение топа ничего не пересчитывает.'
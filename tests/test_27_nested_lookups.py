@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def selects_from(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27NestedLookups:
+
+    def test_01_review_post_loads_title_once(self, admin_client,
+                                             user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ок', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['title'] == titles[0]['name']
+        assert len(selects_from(context, 'reviews_title')) == 1, (
+            'Проверьте, что произведение загружается один раз за запрос.'
+        )
+
+    def test_02_comment_post_loads_parents_in_one_query(self, admin_client,
+                                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Ок', 'score': 7}
+        )
+        review = response.json()
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+               'comments/')
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['review'] == review['text']
+        assert not selects_from(context, 'reviews_title'), (
+            'Проверьте, что произведение загружается вместе с отзывом.'
+        )
+        assert len(selects_from(context, 'reviews_review')) == 1, (
+            'Проверьте, что отзыв загружается один раз за запрос.'
+        )
+
+    def test_03_review_of_other_title(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Ок', 'score': 7}
+        )
+        url = (f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+               f'{response.json()["id"]}/comments/')
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
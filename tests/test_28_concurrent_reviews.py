@@ -0,0 +1,103 @@
+import threading
+from types import SimpleNamespace
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+THREADS = 8
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ConcurrentReviews:
+
+    def test_01_duplicate_review_insert(self, admin_client, user_client):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        barrier = threading.Barrier(THREADS)
+        statuses = []
+        credentials = user_client._credentials
+
+        def post():
+            client = APIClient()
+            client.credentials(**credentials)
+            barrier.wait()
+            try:
+                response = client.post(url, data={'text': 'Ок', 'score': 7})
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert statuses.count(HTTPStatus.CREATED) == 1, (
+            'Из параллельных одинаковых запросов отзыв должен создать '
+            f'ровно один. Ответы: {statuses}'
+        )
+        assert statuses.count(HTTPStatus.BAD_REQUEST) == THREADS - 1, (
+            'Повторные отзывы должны получать 400, а не 500. '
+            f'Ответы: {statuses}'
+        )
+        assert Review.objects.count() == 1
+
+    def test_02_duplicate_review_message(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Ок', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(url, data={'text': 'Ок', 'score': 7})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'non_field_errors' in response.json()
+
+    def test_03_review_of_deleted_title(self, admin_client, user):
+        from rest_framework.exceptions import NotFound
+
+        from api.serializers import ReviewSerializer
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        Title.objects.filter(pk=title.pk).delete()
+        serializer = ReviewSerializer(
+            data={'text': 'Ок', 'score': 7},
+            context={'request': SimpleNamespace(user=user)}
+        )
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(NotFound):
+            serializer.save(author=user, title=title)
+        assert not Review.objects.exists()
+
+    def test_04_other_integrity_errors_are_raised(self, admin_client, user,
+                                                   monkeypatch):
+        from django.db import IntegrityError
+        from rest_framework import serializers
+
+        from api.serializers import ReviewSerializer
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+
+        def fail(self, validated_data):
+            raise IntegrityError('CHECK constraint failed: score')
+
+        monkeypatch.setattr(serializers.ModelSerializer, 'create', fail)
+        serializer = ReviewSerializer(
+            data={'text': 'Ок', 'score': 7},
+            context={'request': SimpleNamespace(user=user)}
+        )
+        assert serializer.is_valid(), serializer.errors
+        with pytest.raises(IntegrityError):
+            serializer.save(
+                author=user, title=Title.objects.get(pk=titles[0]['id'])
+            )
+
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def review_urls(admin_client, user_client):
+    titles, _, _ = create_titles(admin_client)
+    title = titles[0]
+    reviews_url = f'/api/v1/titles/{title["id"]}/reviews/'
+    review = user_client.post(
+        reviews_url, data={'text': 'Очень длинный отзыв ' * 50, 'score': 7}
+    ).json()
+    comments_url = f'{reviews_url}{review["id"]}/comments/'
+    for number in range(3):
+        user_client.post(comments_url, data={'text': f'Комментарий {number}'})
+    return title, review, reviews_url, comments_url
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29CompactRefs:
+
+    def test_01_full_by_default(self, client, review_urls):
+        title, review, reviews_url, comments_url = review_urls
+        comments = client.get(comments_url).json()['results']
+        assert all(item['review'] == review['text'] for item in comments)
+        reviews = client.get(reviews_url).json()['results']
+        assert reviews[0]['title'] == title['name']
+
+    def test_02_id_mode(self, client, review_urls):
+        title, review, reviews_url, comments_url = review_urls
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{comments_url}?refs=id')
+        assert response.status_code == HTTPStatus.OK
+        comments = response.json()['results']
+        assert all(item['review'] == review['id'] for item in comments)
+        list_query = context.captured_queries[-1]['sql']
+        assert 'JOIN "reviews_review"' not in list_query, (
+            'Проверьте, что в режиме refs=id отзыв не присоединяется '
+            'к каждой строке.'
+        )
+        reviews = client.get(f'{reviews_url}?refs=id').json()['results']
+        assert reviews[0]['title'] == title['id']
+        response = client.get(f'{reviews_url}{review["id"]}/?refs=parent')
+        assert response.json()['title'] == title['id']
+
+    def test_03_parent_mode(self, client, review_urls):
+        title, review, reviews_url, comments_url = review_urls
+        data = client.get(f'{comments_url}?refs=parent').json()
+        assert all('review' not in item for item in data['results'])
+        assert data['parent'] == {
+            'title': {'id': title['id'], 'name': title['name']},
+            'review': {'id': review['id'], 'text': review['text']},
+        }
+        data = client.get(f'{reviews_url}?refs=parent&cursor=').json()
+        assert all('title' not in item for item in data['results'])
+        assert data['parent'] == {
+            'title': {'id': title['id'], 'name': title['name']}
+        }
+        full = client.get(comments_url).content
+        compact = client.get(f'{comments_url}?refs=parent').content
+        assert len(compact) < len(full) / 2, (
+            'Проверьте, что текст отзыва не повторяется в каждом комментарии.'
+        )
+
+    def test_04_bad_mode(self, client, review_urls):
+        _, _, _, comments_url = review_urls
+        response = client.get(f'{comments_url}?refs=all')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def list_query(context, table):
+    return next(
+        query['sql'] for query in reversed(context.captured_queries)
+        if query['sql'].startswith(f'SELECT "{table}"."id"')
+        and 'COUNT' not in query['sql']
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30SparseFields:
+
+    def test_01_title_fields(self, admin_client, client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert results and all(
+            set(title) == {'id', 'name', 'rating'} for title in results
+        )
+        sql = list_query(context, 'reviews_title')
+        assert '"description"' not in sql, (
+            'Проверьте, что ненужные столбцы не загружаются (only()).'
+        )
+        assert 'reviews_category' not in sql
+        assert not any(
+            'reviews_genre' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что жанры не загружаются, если их не запросили.'
+
+    def test_02_omit(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?omit=description,genre'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'category'
+        }
+        assert response.json()['category']['slug'] == titles[0]['category']
+
+    def test_03_reviews_and_dictionaries(self, admin_client, user_client,
+                                         client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client.post(url, data={'text': 'Ок', 'score': 7})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?fields=id,score,pub_date&cursor=')
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()['results'][0]) == {
+            'id', 'score', 'pub_date'
+        }
+        sql = list_query(context, 'reviews_review')
+        assert 'JOIN' not in sql and '"text"' not in sql
+        response = client.get('/api/v1/genres/?fields=slug')
+        assert all(set(genre) == {'slug'} for genre in response.json()[
+            'results'
+        ])
+
+    def test_04_unknown_field_and_writes(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post('/api/v1/genres/?fields=slug', data={
+            'name': 'Триллер', 'slug': 'thriller'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json() == {'name': 'Триллер', 'slug': 'thriller'}, (
+            'Выбор полей не должен влиять на запись.'
+        )
@@ -0,0 +1,86 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+class Test31Renderers:
+
+    def test_01_fast_json_matches_drf(self):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.renderers import FastJSONRenderer
+
+        data = {
+            'date': datetime(2023, 5, 1, 12, 30, 0, 123456,
+                             tzinfo=timezone.utc),
+            'decimal': Decimal('7.5'),
+            'text': 'Текст с разделителем',
+            'items': [1, None, True, 2 ** 70],
+        }
+        assert FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        ), 'FastJSONRenderer должен выдавать те же байты, что JSONRenderer.'
+
+    def test_02_fast_json_parser(self):
+        from rest_framework.exceptions import ParseError
+
+        from api.parsers import FastJSONParser
+
+        body = json.dumps({'name': 'Имя', 'genre': ['drama']}).encode()
+        assert FastJSONParser().parse(io.BytesIO(body)) == {
+            'name': 'Имя', 'genre': ['drama']
+        }
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": NaN'))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31RendererNegotiation:
+
+    def test_01_msgpack_by_accept(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/msgpack'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/msgpack'
+        assert response.content[:1] == bytes((0x84,)), (
+            'Страница списка должна кодироваться словарем из 4 ключей.'
+        )
+
+    def test_02_msgpack_roundtrip(self, admin_client, client):
+        import msgpack
+
+        create_titles(admin_client)
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/msgpack'
+        )
+        assert msgpack.unpackb(response.content) == client.get(
+            '/api/v1/titles/'
+        ).json()
+
+    def test_03_json_by_default(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()['count'] == 2
+
+    def test_04_benchmark_command(self, tmp_path):
+        output = tmp_path / 'renderers.json'
+        call_command(
+            'benchmark_renderers', items=50, repeat=2, output=str(output),
+            stdout=io.StringIO()
+        )
+        results = json.loads(output.read_text(encoding='utf-8'))
+        for page in ('titles', 'reviews'):
+            assert set(results[page]) == {'json', 'fast_json', 'msgpack'}
+            assert results[page]['json']['bytes'] == (
+                results[page]['fast_json']['bytes']
+            )